@@ -0,0 +1,96 @@
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+# run as a script, only the benchmarks are on the path
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+from jsonschema.draft_2020_12 import raw  # noqa: E402
+from jsonschema.schema import Schema  # noqa: E402
+
+
+def tenant_schema(tenant: int) -> dict:
+    return {
+        "$id": f"https://example.com/tenants/{tenant}/order.json",
+        "type": "object",
+        "required": ["id", "customer", "lines"],
+        "properties": {
+            "id": {"type": "string", "pattern": "^[A-Z]{3}-[0-9]+$"},
+            "customer": {"$ref": "#/$defs/customer"},
+            "lines": {
+                "type": "array",
+                "minItems": 1,
+                "items": {"$ref": "#/$defs/line"}
+            },
+            "status": {"enum": ["open", "paid", "shipped", "closed"]},
+            "notes": {"type": "string", "maxLength": 1000}
+        },
+        "additionalProperties": False,
+        "$defs": {
+            "customer": {
+                "type": "object",
+                "required": ["name"],
+                "properties": {
+                    "name": {"type": "string", "minLength": 1},
+                    "email": {"type": "string", "format": "email"},
+                    "tier": {"enum": ["free", "pro", "enterprise"]}
+                }
+            },
+            "line": {
+                "type": "object",
+                "required": ["sku", "quantity"],
+                "properties": {
+                    "sku": {"type": "string"},
+                    "quantity": {"type": "integer", "minimum": 1},
+                    "price": {"type": "number", "exclusiveMinimum": 0}
+                }
+            }
+        }
+    }
+
+
+def count_nodes() -> int:
+    return sum(1 for o in gc.get_objects() if isinstance(o, Schema))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Measure the memory held by compiled schemas."
+    )
+    parser.add_argument("--schemas", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    data = [tenant_schema(tenant) for tenant in range(args.schemas)]
+    schema_by_uri = dict(raw.schema_by_uri)
+
+    gc.collect()
+    nodes_before = count_nodes()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+
+    schemas = [Schema(d, schema_by_uri=schema_by_uri) for d in data]
+
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    size = sum(
+        stat.size_diff for stat in after.compare_to(before, "filename")
+    )
+    nodes = count_nodes() - nodes_before
+
+    print(
+        f"schemas: {len(schemas)}, nodes: {nodes},"
+        f" bytes: {size}, bytes/schema: {size / len(schemas):.0f},"
+        f" bytes/node: {size / nodes:.0f}"
+    )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# runs in a fresh interpreter, so that nothing is imported yet
+_PROBE = """
+import time
+start = time.perf_counter()
+from jsonschema.draft_2020_12 import raw
+from jsonschema.schema import Schema
+imported = time.perf_counter()
+schema = Schema(
+    {"type": "object", "properties": {"id": {"type": "integer"}}},
+    schema_by_uri=dict(raw.schema_by_uri)
+)
+schema.validate({"id": 1})
+validated = time.perf_counter()
+Schema({"$ref": "https://json-schema.org/draft/2020-12/schema"},
+       schema_by_uri=dict(raw.schema_by_uri)).validate({"type": "string"})
+meta_validated = time.perf_counter()
+print(imported - start, validated - imported, meta_validated - validated)
+"""
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Measure the import time of the draft 2020-12 module."
+    )
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in (root, env.get("PYTHONPATH")) if p
+    )
+
+    samples = list[tuple[float, ...]]()
+    for _ in range(args.runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout
+        samples.append(tuple(float(v) for v in out.split()))
+
+    for index, name in enumerate((
+        "import", "first validation", "first metaschema validation"
+    )):
+        values = [sample[index] * 1000 for sample in samples]
+        print(
+            f"{name}: min {min(values):.2f}ms,"
+            f" median {statistics.median(values):.2f}ms"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# run as a script, only the benchmarks are on the path
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+from jsonschema.draft_2020_12 import raw  # noqa: E402
+from jsonschema.schema import Schema  # noqa: E402
+
+
+def measure(f: Callable[[], object], repeat: int) -> dict:
+    times = list[float]()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        times.append(time.perf_counter() - start)
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "repeat": repeat,
+    }
+
+
+def load_remotes(tests: str) -> dict:
+    schema_by_uri = dict()
+
+    remotes = os.path.join(tests, "remotes")
+    for root, dirs, files in os.walk(remotes):
+        base = os.path.relpath(root, remotes).replace(os.sep, "/")
+        base = "" if base == "." else base + "/"
+        for remote_file in files:
+            with open(os.path.join(root, remote_file)) as f:
+                uri = f"http://localhost:1234/{base}{remote_file}"
+                schema_by_uri[uri] = json.load(f)
+
+    schema_by_uri.update(raw.schema_by_uri)
+    return schema_by_uri
+
+
+def suite_benchmarks(tests: str, repeat: int) -> list[dict]:
+    directory = os.path.join(tests, "tests", "draft2020-12")
+    schema_by_uri = load_remotes(tests)
+
+    results = list[dict]()
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for test_file in sorted(files):
+            if not test_file.endswith(".json"):
+                continue
+            path = os.path.join(root, test_file)
+            with open(path) as f:
+                groups = json.load(f)
+
+            def build():
+                # every schema gets the remotes as they were loaded
+                return [
+                    Schema(group["schema"], schema_by_uri=dict(schema_by_uri))
+                    for group in groups
+                ]
+
+            try:
+                schemas = build()
+            except Exception as e:
+                results.append({
+                    "name": os.path.relpath(path, directory),
+                    "error": f"{type(e).__name__}: {e}",
+                })
+                continue
+
+            cases = [
+                (schema, case["data"], case["valid"])
+                for schema, group in zip(schemas, groups)
+                for case in group["tests"]
+            ]
+
+            def validate():
+                for schema, instance, _ in cases:
+                    schema.validate(instance)
+
+            failures = 0
+            for schema, instance, valid in cases:
+                try:
+                    if schema.validate(instance) != valid:
+                        failures += 1
+                except Exception:
+                    failures += 1
+
+            result = {
+                "name": os.path.relpath(path, directory).replace(os.sep, "/"),
+                "cases": len(cases),
+                "failures": failures,
+                "build": measure(build, repeat),
+            }
+            if failures == 0:
+                result["validate"] = measure(validate, repeat)
+            results.append(result)
+
+    return results
+
+
+def wide_object(scale: int) -> tuple[dict, object]:
+    width = max(1, scale // 100)
+    schema = {
+        "type": "object",
+        "properties": {
+            f"p{i}": {"type": "integer", "minimum": 0}
+            for i in range(0, width, 2)
+        },
+        "patternProperties": {"^p[0-9]*[13579]$": {"type": "integer"}},
+        "additionalProperties": False,
+        "required": [f"p{i}" for i in range(0, width, 10)],
+    }
+    return schema, {f"p{i}": i for i in range(width)}
+
+
+def long_array(scale: int) -> tuple[dict, object]:
+    schema = {
+        "type": "array",
+        "items": {"type": "number", "minimum": 0},
+        "contains": {"const": scale - 1},
+    }
+    return schema, list(range(scale))
+
+
+def deep_ref(scale: int) -> tuple[dict, object]:
+    # kept within the default recursion limit
+    depth = min(max(1, scale // 10000), 150)
+    schema = {
+        "$ref": "#/$defs/node",
+        "$defs": {
+            "node": {
+                "type": "object",
+                "required": ["value"],
+                "properties": {
+                    "value": {"type": "integer"},
+                    "next": {"$ref": "#/$defs/node"},
+                },
+            },
+        },
+    }
+    instance: dict = {"value": depth}
+    for value in range(depth - 1, -1, -1):
+        instance = {"value": value, "next": instance}
+    return schema, instance
+
+
+def large_enum(scale: int) -> tuple[dict, object]:
+    size = max(1, scale // 100)
+    schema = {
+        "type": "array",
+        "items": {"enum": [f"v{i}" for i in range(size)] + [None, 1.5]},
+    }
+    return schema, [f"v{i}" for i in range(size)]
+
+
+def unique_items(scale: int) -> tuple[dict, object]:
+    size = max(1, scale // 10)
+    schema = {"type": "array", "uniqueItems": True}
+    return schema, [{"id": i, "tags": [i, str(i)]} for i in range(size)]
+
+
+SCALING = {
+    "wide_object": wide_object,
+    "long_array": long_array,
+    "deep_ref": deep_ref,
+    "large_enum": large_enum,
+    "unique_items": unique_items,
+}
+
+
+def scaling_benchmarks(
+    names: list[str],
+    scale: int,
+    repeat: int
+) -> list[dict]:
+    results = list[dict]()
+    for name in names:
+        data, instance = SCALING[name](scale)
+        schema = Schema(data, schema_by_uri=dict(raw.schema_by_uri))
+        valid = schema.validate(instance)
+        results.append({
+            "name": name,
+            "scale": scale,
+            "valid": valid,
+            "build": measure(
+                lambda: Schema(data, schema_by_uri=dict(raw.schema_by_uri)),
+                repeat
+            ),
+            "validate": measure(lambda: schema.validate(instance), repeat),
+        })
+    return results
+
+
+def commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=_ROOT,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Time schema construction and validation, as JSON."
+    )
+    parser.add_argument(
+        "--tests",
+        default=os.path.join(_ROOT, "tests"),
+        help="checkout of the JSON-Schema-Test-Suite"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--scale",
+        type=int,
+        default=1_000_000,
+        help="size of the synthetic instances, in array items"
+    )
+    parser.add_argument(
+        "--only",
+        action="append",
+        choices=["suite", *SCALING],
+        help="run these benchmarks only, may be repeated"
+    )
+    parser.add_argument("--output", help="write the results to this file")
+    args = parser.parse_args(argv)
+
+    only = args.only or ["suite", *SCALING]
+
+    report = {
+        "commit": commit(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "suite": None,
+        "scaling": scaling_benchmarks(
+            [name for name in SCALING if name in only],
+            args.scale,
+            args.repeat
+        ),
+    }
+
+    if "suite" in only:
+        if os.path.isdir(os.path.join(args.tests, "tests", "draft2020-12")):
+            report["suite"] = suite_benchmarks(args.tests, args.repeat)
+        else:
+            print(
+                f"no test suite under {args.tests}, skipped",
+                file=sys.stderr
+            )
+
+    text = json.dumps(report, indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
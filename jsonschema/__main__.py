@@ -0,0 +1,205 @@
+import argparse
+import collections
+import json
+import sys
+from typing import BinaryIO, Iterator
+from .cache import ResultCache
+from .draft_2020_12 import raw
+from .parallel import ParallelValidator
+from .registry import SchemaRegistry
+
+RECORD_SEPARATOR = b"\x1e"
+
+
+def read_records(
+    stream: BinaryIO,
+    sequence: bool,
+    buffer_size: int
+) -> Iterator[tuple[int, bytes]]:
+    number = 0
+
+    if not sequence:
+        while lines := stream.readlines(buffer_size):
+            for line in lines:
+                number += 1
+                if line.strip():
+                    yield number, line
+        return
+
+    rest = b""
+    while block := stream.read(buffer_size):
+        records = (rest + block).split(RECORD_SEPARATOR)
+        rest = records.pop()
+        for record in records:
+            if record.strip():
+                number += 1
+                yield number, record
+    if rest.strip():
+        number += 1
+        yield number, rest
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if len(sorted_values) == 0:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    return sorted_values[index]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m jsonschema",
+        description="Validate NDJSON or JSON text sequence records."
+    )
+    parser.add_argument("schema", help="path of the schema")
+    parser.add_argument(
+        "inputs", nargs="*",
+        help="record files, standard input if omitted or '-'"
+    )
+    parser.add_argument(
+        "--schema-dir",
+        help="directory of schemas available to references"
+    )
+    parser.add_argument(
+        "--base-uri", default="http://localhost:1234/",
+        help="URI the schema directory is served from"
+    )
+    parser.add_argument(
+        "--seq", action="store_true",
+        help="inputs are JSON text sequences (RFC 7464)"
+    )
+    parser.add_argument(
+        "--processes", type=int, default=1,
+        help="worker processes, 0 for one per CPU"
+    )
+    parser.add_argument("--chunk-size", type=int, default=1024)
+    parser.add_argument("--buffer-size", type=int, default=1 << 20)
+    parser.add_argument(
+        "--failures-only", action="store_true",
+        help="only report records that failed"
+    )
+    parser.add_argument(
+        "--cache", type=int, default=0,
+        help="results of this many distinct records are kept, 0 for none"
+    )
+    parser.add_argument(
+        "--cache-ttl", type=float,
+        help="seconds a cached result is kept"
+    )
+    args = parser.parse_args(argv)
+
+    schema_by_uri = SchemaRegistry(args.schema_dir, base_uri=args.base_uri)
+    schema_by_uri.update(raw.schema_by_uri)
+
+    with open(args.schema) as f:
+        schema_data = json.load(f)
+
+    cache = None
+    if args.cache > 0:
+        cache = ResultCache(args.cache, ttl=args.cache_ttl)
+
+    # records that don't parse or whose result is cached never reach the
+    # validator, but are reported in order with the results that do; the
+    # others keep their bytes until their result can be cached
+    pending = collections.deque[
+        tuple[str, int, str | None, bool | None, bytes | None]
+    ]()
+
+    def instances():
+        for path in args.inputs or ["-"]:
+            if path == "-":
+                stream = sys.stdin.buffer
+            else:
+                stream = open(path, "rb", buffering=args.buffer_size)
+            with stream:
+                for number, record in read_records(
+                    stream, args.seq, args.buffer_size
+                ):
+                    if cache is not None:
+                        valid = cache.lookup(validator.schema, raw=record)
+                        if valid is not None:
+                            pending.append((path, number, None, valid, None))
+                            continue
+                    try:
+                        instance = json.loads(record)
+                    except ValueError as e:
+                        pending.append((path, number, str(e), None, None))
+                        continue
+                    pending.append((
+                        path, number, None, None,
+                        None if cache is None else record
+                    ))
+                    yield instance
+
+    out = sys.stdout
+    malformed = 0
+    cached = 0
+    cached_failures = 0
+    latencies = list[float]()
+
+    def report(path: str, number: int, valid: bool, error=None):
+        if valid and args.failures_only:
+            return
+        result = {"input": path, "record": number, "valid": valid}
+        if error is not None:
+            result["error"] = error
+        out.write(json.dumps(result) + "\n")
+
+    def flush_resolved():
+        nonlocal malformed, cached, cached_failures
+        while len(pending) > 0 and (
+            pending[0][2] is not None or pending[0][3] is not None
+        ):
+            path, number, error, valid, _ = pending.popleft()
+            if error is not None:
+                malformed += 1
+                report(path, number, False, error)
+            else:
+                assert valid is not None
+                cached += 1
+                if not valid:
+                    cached_failures += 1
+                report(path, number, valid)
+
+    validator = ParallelValidator(
+        schema_data,
+        schema_by_uri=schema_by_uri,
+        processes=args.processes or None,
+        chunk_size=args.chunk_size
+    )
+
+    with validator:
+        for valid, seconds in validator.validate_timed(instances()):
+            flush_resolved()
+            path, number, _, _, record = pending.popleft()
+            if cache is not None:
+                assert record is not None
+                cache.store(validator.schema, valid, raw=record)
+            latencies.append(seconds)
+            report(path, number, valid)
+        flush_resolved()
+
+    out.flush()
+
+    latencies.sort()
+    records = validator.documents + malformed + cached
+    failures = validator.failures + malformed + cached_failures
+    summary = (
+        f"records: {records}, failures: {failures}"
+        f" (malformed: {malformed}),"
+    )
+    if cache is not None:
+        summary += f" cached: {cached},"
+    print(
+        summary +
+        f" records/s: {validator.throughput:.0f},"
+        f" p50: {percentile(latencies, 0.50) * 1e6:.1f}us,"
+        f" p99: {percentile(latencies, 0.99) * 1e6:.1f}us",
+        file=sys.stderr
+    )
+
+    return 0 if failures == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+import time
+from typing import TYPE_CHECKING, Callable
+from .output import schema_location
+
+if TYPE_CHECKING:
+    from .profile import Profiler
+    from .schema import Schema
+    from .vocabulary import DynamicScope
+
+EVALUATIONS = "evaluations"
+DEPTH = "depth"
+DEADLINE = "deadline"
+
+
+class BudgetExceeded(Exception):
+
+    def __init__(
+        self,
+        budget: str,
+        limit: int | float,
+        location: str,
+        depth: int,
+        evaluations: int
+    ):
+        super().__init__(
+            f"validation exceeded its {budget} budget of {limit}"
+            f" at {location}"
+        )
+        # one of EVALUATIONS, DEPTH and DEADLINE
+        self.budget = budget
+        self.limit = limit
+        # the schema entered when the budget ran out
+        self.location = location
+        self.depth = depth
+        self.evaluations = evaluations
+
+
+class Budget:
+    # bounds one validation at a time, each Schema.validate() call it's
+    # given to starts over; checked whenever a schema is entered, so a
+    # single keyword isn't interrupted: a "pattern" or "patternProperties"
+    # search backtracking catastrophically runs to its end, as re can't be
+    # stopped, and the deadline is only noticed at the next schema entered
+
+    def __init__(
+        self,
+        max_evaluations: int | None = None,
+        max_depth: int | None = None,
+        timeout: float | None = None,
+        profiler: "Profiler | None" = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_evaluations = max_evaluations
+        self.max_depth = max_depth
+        # in seconds
+        self.timeout = timeout
+        self.profiler = profiler
+        self.clock = clock
+        self.evaluations = 0
+        self.depth = 0
+        self.deadline: float | None = None
+
+    def run(self, schema: "Schema", instance, scope: "DynamicScope") -> bool:
+        if self.depth == 0:
+            self.evaluations = 0
+            if self.timeout is not None:
+                self.deadline = self.clock() + self.timeout
+
+        self.depth += 1
+        try:
+            validators = schema.validators
+            assert validators is not None
+
+            # every keyword of a schema entered counts, even if an earlier
+            # one fails
+            self.evaluations += len(validators)
+
+            if self.max_depth is not None and self.depth > self.max_depth:
+                raise self._exceeded(DEPTH, self.max_depth, schema)
+            if (
+                self.max_evaluations is not None
+                and self.evaluations > self.max_evaluations
+            ):
+                raise self._exceeded(
+                    EVALUATIONS, self.max_evaluations, schema
+                )
+            if self.deadline is not None and self.clock() > self.deadline:
+                assert self.timeout is not None
+                raise self._exceeded(DEADLINE, self.timeout, schema)
+
+            if self.profiler is not None:
+                return self.profiler.run(schema, instance, scope)
+
+            for validator in validators:
+                if not validator(instance, scope):
+                    return False
+            return True
+        finally:
+            self.depth -= 1
+
+    def _exceeded(
+        self,
+        budget: str,
+        limit: int | float,
+        schema: "Schema"
+    ) -> BudgetExceeded:
+        return BudgetExceeded(
+            budget,
+            limit,
+            schema_location(schema),
+            self.depth,
+            self.evaluations
+        )
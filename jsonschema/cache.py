@@ -0,0 +1,156 @@
+import collections
+import threading
+import time
+from typing import Any, Callable
+from .schema import Schema
+
+
+# mixed into the hashes of values python hashes alike
+_TRUE = hash("boolean true")
+_FALSE = hash("boolean false")
+_FLOAT = hash("float")
+_ARRAY = hash("array")
+_OBJECT = hash("object")
+
+
+def instance_hash(value) -> int:
+    # equal for instances any schema validates alike: objects regardless of
+    # key order, numbers apart from booleans, floats apart from integers so
+    # that arithmetic keywords see the same values
+    t = type(value)
+    if t is dict:
+        h = _OBJECT
+        for k, v in value.items():
+            h ^= hash((k, instance_hash(v)))
+        return h
+    if t is list:
+        return hash((_ARRAY, *map(instance_hash, value)))
+    if t is bool:
+        return _TRUE if value else _FALSE
+    if t is float:
+        return hash(value) ^ _FLOAT
+    return hash(value)
+
+
+def instance_equal(a, b) -> bool:
+    # the equality instance_hash agrees with
+    t = type(a)
+    if t is not type(b):
+        return False
+    if t is list:
+        return len(a) == len(b) and all(map(instance_equal, a, b))
+    if t is dict:
+        return len(a) == len(b) and all(
+            k in b and instance_equal(v, b[k]) for k, v in a.items()
+        )
+    return a == b
+
+
+class ResultCache:
+    # results of documents already validated, least recently used first;
+    # instances are found by hash and compared in full, so distinct ones
+    # never share a result
+
+    def __init__(
+        self,
+        max_size: int = 4096,
+        ttl: float | None = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_size = max_size
+        # in seconds, entries never expire if None
+        self.ttl = ttl
+        self.clock = clock
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        # by schema and either raw bytes or instance hash, with the instance
+        # the result is for
+        self._entries = collections.OrderedDict[
+            tuple[Schema, bytes | int], tuple[Any, bool, float | None]
+        ]()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(
+        schema: Schema,
+        instance,
+        raw: bytes | None
+    ) -> tuple[Schema, bytes | int]:
+        # a document's bytes stand for it as they are, no need to parse them
+        if raw is not None:
+            return (schema, raw)
+        return (schema, instance_hash(instance))
+
+    def lookup(
+        self,
+        schema: Schema,
+        instance=None,
+        raw: bytes | None = None
+    ) -> bool | None:
+        key = ResultCache._key(schema, instance, raw)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (
+                raw is not None or instance_equal(entry[0], instance)
+            ):
+                _, valid, expires = entry
+                if expires is None or self.clock() < expires:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return valid
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+        return None
+
+    def store(
+        self,
+        schema: Schema,
+        valid: bool,
+        instance=None,
+        raw: bytes | None = None
+    ):
+        key = ResultCache._key(schema, instance, raw)
+        expires = None if self.ttl is None else self.clock() + self.ttl
+        with self._lock:
+            # a different instance with the same hash is replaced; the
+            # instance is kept as given, once changed it no longer hits
+            self._entries[key] = (
+                None if raw is not None else instance, valid, expires
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def validate(
+        self,
+        schema: Schema,
+        instance,
+        raw: bytes | None = None
+    ) -> bool:
+        valid = self.lookup(schema, instance, raw)
+        if valid is None:
+            valid = schema.validate(instance)
+            self.store(schema, valid, instance, raw)
+        return valid
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -1,14 +1,30 @@
-import re
 import sys
-from ..vocabulary import Vocabulary, Schema, DynamicScope
+from typing import MutableMapping
+from .. import ecma262
+from ..output import Location, Output, pointer_segment, render
+from ..vocabulary import Vocabulary, Schema, DynamicScope, Validator
 
 
 class Applicator(Vocabulary):
+    keywords = {
+        "_not": ("not",),
+        "_one_of": ("oneOf",),
+        "_any_of": ("anyOf",),
+        "_all_of": ("allOf",),
+        "_if": ("if", "then", "else"),
+        "_array": ("prefixItems", "items", "contains"),
+        "_property_names": ("propertyNames",),
+        "_dependent_schemas": ("dependentSchemas",),
+        "_object": (
+            "properties", "patternProperties", "additionalProperties"
+        ),
+        "_properties": ("properties",),
+    }
 
     @staticmethod
     def on_schema_init(
         schema: Schema,
-        schema_by_uri: dict[str, "Schema | dict | bool"],
+        schema_by_uri: MutableMapping[str, "Schema | dict | bool"],
         refs: list
     ):
         for k, v in schema.fields.items():
@@ -42,223 +58,421 @@ class Applicator(Vocabulary):
                         data=sub_schema,
                         parent=schema,
                         schema_by_uri=schema_by_uri,
-                        refs=refs
+                        refs=refs,
+                        defer=True
                     )
                     for name, sub_schema in v.items()
                 }
 
     @staticmethod
-    def validate(
-        s: Schema,
-        instance,
-        scope: DynamicScope
-    ):
-        if "not" in s.fields:
-            sub = s.fields["not"]
-            assert isinstance(sub, Schema)
-            if sub.validate(
-                instance,
-                prev_scope=scope
-            ):
-                return False
-
-        if "oneOf" in s.fields:
-            count = 0
-            for sub in s.fields["oneOf"]:
-                assert isinstance(sub, Schema)
-                # locally_evaluated_properties_0 = set[str]()
-                if sub.validate(
-                    instance=instance,
-                    prev_scope=scope
-                ):
-                    count += 1
-            if count != 1:
-                return False
-
-        if "anyOf" in s.fields:
-            count = 0
-            for sub in s.fields["anyOf"]:
-                assert isinstance(sub, Schema)
-                # locally_evaluated_properties_0 = set[str]()
-                if sub.validate(
-                    instance=instance,
-                    prev_scope=scope
-                ):
-                    count += 1
-            if count == 0:
-                return False
-
-        if "allOf" in s.fields:
-            count = 0
-            subs = s.fields["allOf"]
-            for sub in subs:
-                assert isinstance(sub, Schema)
-                # locally_evaluated_properties = set[str]()
-                if sub.validate(
-                    instance=instance,
-                    prev_scope=scope
-                ):
-                    count += 1
-                # evaluated_properties.update(locally_evaluated_properties)
-            if count != len(subs):
-                return False
-
-        if "if" in s.fields:
-            sub = s.fields["if"]
-            assert isinstance(sub, Schema)
-            result = sub.validate(
-                instance=instance,
-                prev_scope=scope
-            )
-            if result and "then" in s.fields:
-                sub = s.fields["then"]
-                assert isinstance(sub, Schema)
-                if not sub.validate(
-                    instance=instance,
-                    prev_scope=scope
-                ):
-                    return False
-                else:
-                    pass
-            if not result and "else" in s.fields:
-                sub = s.fields["else"]
-                assert isinstance(sub, Schema)
-                if not sub.validate(
-                    instance=instance,
-                    prev_scope=scope
-                ):
+    def in_place_subschemas(
+        s: Schema
+    ) -> list[Schema]:
+        subschemas = list[Schema]()
+        for k in ("if", "then", "else", "not"):
+            if k in s.fields:
+                subschemas.append(s.fields[k])
+        for k in ("allOf", "anyOf", "oneOf"):
+            if k in s.fields:
+                subschemas.extend(s.fields[k])
+        if "dependentSchemas" in s.fields:
+            subschemas.extend(s.fields["dependentSchemas"].values())
+        return subschemas
+
+    @staticmethod
+    def compile(
+        s: Schema
+    ) -> list[Validator]:
+        validators = list[Validator]()
+        fields = s.fields
+
+        if "not" in fields:
+            not_sub: Schema = fields["not"]
+
+            def _not(instance, scope: DynamicScope):
+                return not not_sub.validate(instance, prev_scope=scope)
+            validators.append(_not)
+
+        annotate = s.annotate
+
+        if "oneOf" in fields:
+            one_of: list[Schema] = fields["oneOf"]
+
+            def _one_of(instance, scope: DynamicScope):
+                count = 0
+                for sub in one_of:
+                    if sub.validate(instance=instance, prev_scope=scope):
+                        count += 1
+                        if count > 1:
+                            return False
+                return count == 1
+            validators.append(_one_of)
+
+        if "anyOf" in fields:
+            any_of: list[Schema] = fields["anyOf"]
+
+            if annotate:
+                # every matching branch contributes annotations
+                def _any_of(instance, scope: DynamicScope):
+                    count = 0
+                    for sub in any_of:
+                        if sub.validate(instance=instance, prev_scope=scope):
+                            count += 1
+                    return count > 0
+            else:
+                def _any_of(instance, scope: DynamicScope):
+                    for sub in any_of:
+                        if sub.validate(instance=instance, prev_scope=scope):
+                            return True
                     return False
-                else:
-                    pass
+            validators.append(_any_of)
 
-        if isinstance(instance, list):
-            locally_evaluated_items = set[int]()
+        if "allOf" in fields:
+            all_of: list[Schema] = fields["allOf"]
+
+            def _all_of(instance, scope: DynamicScope):
+                for sub in all_of:
+                    if not sub.validate(instance=instance, prev_scope=scope):
+                        return False
+                return True
+            validators.append(_all_of)
 
-            if "prefixItems" in s.fields:
-                for index, sub in enumerate(s.fields["prefixItems"]):
-                    assert isinstance(sub, Schema)
+        if "if" in fields:
+            if_sub: Schema = fields["if"]
+            then_sub: Schema | None = fields.get("then")
+            else_sub: Schema | None = fields.get("else")
+
+            def _if(instance, scope: DynamicScope):
+                if if_sub.validate(instance=instance, prev_scope=scope):
+                    if then_sub is not None:
+                        return then_sub.validate(
+                            instance=instance,
+                            prev_scope=scope
+                        )
+                elif else_sub is not None:
+                    return else_sub.validate(
+                        instance=instance,
+                        prev_scope=scope
+                    )
+                return True
+            validators.append(_if)
+
+        prefix_items: list[Schema] = fields.get("prefixItems", [])
+        items: Schema | None = fields.get("items")
+        contains: Schema | None = fields.get("contains")
+
+        if len(prefix_items) > 0 or items is not None or contains is not None:
+            min_contains: int = fields.get("minContains", 1)
+            max_contains: int = fields.get("maxContains", sys.maxsize)
+
+            def _array(instance, scope: DynamicScope):
+                if not isinstance(instance, list):
+                    return True
+
+                for index, sub in enumerate(prefix_items):
                     if index >= len(instance):
                         break
-                    item = instance[index]
-                    if not sub.validate(
-                        item,
-                        prev_scope=scope
-                    ):
+                    if not sub.validate(instance[index], prev_scope=scope):
                         return False
-                    locally_evaluated_items.add(index)
-
-            if "items" in s.fields:
-                sub = s.fields["items"]
-                assert isinstance(sub, Schema)
-                initial_index = 0
-                if "prefixItems" in s.fields:
-                    initial_index = len(s.fields["prefixItems"])
-
-                if initial_index < len(instance):
-                    for index, item in enumerate(
-                        instance[initial_index:],
-                        start=initial_index
-                    ):
-                        if not sub.validate(
-                            item,
+
+                if items is not None:
+                    for index in range(len(prefix_items), len(instance)):
+                        if not items.validate(
+                            instance[index],
                             prev_scope=scope
                         ):
                             return False
-                        # elif item not in evaluated_items:
-                        #    locally_evaluated_items.append(item)
-                        locally_evaluated_items.add(index)
-
-            if "contains" in s.fields:
-                sub = s.fields["contains"]
-                assert isinstance(sub, Schema)
 
-                min_contains: int = s.fields.get("minContains", 1)
-                max_contains: int = s.fields.get(
-                    "maxContains", sys.maxsize
-                )
+                # only collected for annotating schemas
+                evaluated_items = None
+                if annotate:
+                    evaluated_items = scope.evaluated_items
+                    assert evaluated_items is not None
+                    if items is not None:
+                        evaluated_items.update(range(len(instance)))
+                    else:
+                        evaluated_items.update(
+                            range(min(len(prefix_items), len(instance)))
+                        )
 
-                count = 0
-                for index, i in enumerate(instance):
-                    if sub.validate(
-                        instance=i,
-                        prev_scope=scope
-                    ):
-                        count += 1
-                        locally_evaluated_items.add(index)
+                if contains is not None:
+                    count = 0
+                    for index, item in enumerate(instance):
+                        if contains.validate(
+                            instance=item,
+                            prev_scope=scope
+                        ):
+                            count += 1
+                            if evaluated_items is not None:
+                                evaluated_items.add(index)
+                            elif count > max_contains:
+                                return False
+                            elif (
+                                count >= min_contains
+                                and max_contains == sys.maxsize
+                            ):
+                                return True
 
-                if count < min_contains or count > max_contains:
-                    return False
+                    if count < min_contains or count > max_contains:
+                        return False
 
-            scope.evaluated_items.update(locally_evaluated_items)
+                return True
+            validators.append(_array)
 
-        if isinstance(instance, dict):
-            if "propertyNames" in s.fields:
-                sub = s.fields["propertyNames"]
-                assert isinstance(sub, Schema)
+        if "propertyNames" in fields:
+            property_names: Schema = fields["propertyNames"]
 
+            def _property_names(instance, scope: DynamicScope):
+                if not isinstance(instance, dict):
+                    return True
                 for prop_name in instance.keys():
-                    if not sub.validate(
+                    if not property_names.validate(
                         instance=prop_name,
                         prev_scope=scope
                     ):
                         return False
+                return True
+            validators.append(_property_names)
 
-            if "dependentSchemas" in s.fields:
-                items = s.fields["dependentSchemas"].items()
-                for prop_name, sub in items:
-                    assert isinstance(sub, Schema)
-                    valid = True
-                    if prop_name in instance:
-                        valid &= sub.validate(
-                            instance=instance,
-                            prev_scope=scope
-                        )
-                    if not valid:
+        if "dependentSchemas" in fields:
+            dependent_schemas: dict[str, Schema] = fields["dependentSchemas"]
+
+            def _dependent_schemas(instance, scope: DynamicScope):
+                if not isinstance(instance, dict):
+                    return True
+                for prop_name, sub in dependent_schemas.items():
+                    if prop_name in instance and not sub.validate(
+                        instance=instance,
+                        prev_scope=scope
+                    ):
                         return False
+                return True
+            validators.append(_dependent_schemas)
 
-            locally_evaluated_props = set[str]()
+        pattern_properties = [
+            (ecma262.compile_pattern(pattern).search, sub)
+            for pattern, sub in fields.get("patternProperties", {}).items()
+        ]
+        properties: dict[str, Schema] = fields.get("properties", {})
+        additional_properties: Schema | None = fields.get(
+            "additionalProperties"
+        )
 
-            if "patternProperties" in s.fields:
-                for key in instance:
-                    props: dict[str, Schema] \
-                        = s.fields["patternProperties"]
-                    for pattern, sub in props.items():
-                        assert isinstance(sub, Schema)
-                        if re.search(
-                            pattern=pattern,
-                            string=key
-                        ):
-                            if not sub.validate(
-                                instance=instance[key],
-                                prev_scope=scope
-                            ):
+        if len(pattern_properties) > 0 or additional_properties is not None:
+            def _object(instance, scope: DynamicScope):
+                if not isinstance(instance, dict):
+                    return True
+
+                evaluated_props = scope.evaluated_props if annotate else None
+
+                for key, value in instance.items():
+                    evaluated = False
+
+                    sub = properties.get(key)
+                    if sub is not None:
+                        if not sub.validate(value, prev_scope=scope):
+                            return False
+                        evaluated = True
+
+                    for search, sub in pattern_properties:
+                        if search(key) is not None:
+                            if not sub.validate(value, prev_scope=scope):
                                 return False
-                            locally_evaluated_props.add(key)
+                            evaluated = True
 
-            if "properties" in s.fields:
-                for key, sub in s.fields["properties"].items():
-                    assert isinstance(sub, Schema)
-                    if key in instance:
-                        if not sub.validate(
-                            instance=instance[key],
+                    if not evaluated and additional_properties is not None:
+                        if not additional_properties.validate(
+                            value,
                             prev_scope=scope
                         ):
                             return False
-                        locally_evaluated_props.add(key)
+                        evaluated = True
 
-            if "additionalProperties" in s.fields:
-                sub = s.fields["additionalProperties"]
-                assert isinstance(sub, Schema)
-                for key in instance:
-                    if key not in locally_evaluated_props:
+                    if evaluated and evaluated_props is not None:
+                        evaluated_props.add(key)
+
+                return True
+            validators.append(_object)
+
+        elif len(properties) > 0:
+            def _properties(instance, scope: DynamicScope):
+                if not isinstance(instance, dict):
+                    return True
+
+                evaluated_props = scope.evaluated_props if annotate else None
+
+                for key, sub in properties.items():
+                    if key in instance:
                         if not sub.validate(
                             instance=instance[key],
                             prev_scope=scope
                         ):
                             return False
-                        locally_evaluated_props.add(key)
+                        if evaluated_props is not None:
+                            evaluated_props.add(key)
+
+                return True
+            validators.append(_properties)
+
+        return validators
+
+    @staticmethod
+    def explain(
+        s: Schema,
+        instance,
+        scope: DynamicScope,
+        location: Location,
+        output: Output
+    ) -> list[dict]:
+        errors = list[dict]()
+        fields = s.fields
+
+        def explain(
+            sub: Schema,
+            value,
+            keyword: str,
+            instance_location: str = "",
+            units: list[dict] | None = None
+        ):
+            if output.full:
+                return
+            unit = sub.explain(
+                value,
+                output,
+                location.child(keyword, instance_location),
+                prev_scope=scope
+            )
+            if unit is not None:
+                (errors if units is None else units).append(unit)
+
+        if "not" in fields and fields["not"].validate(
+            instance,
+            prev_scope=scope
+        ):
+            errors.append(output.error(
+                location.child("/not"),
+                f"{render(instance)} must not be valid against the subschema"
+            ))
+
+        for i, sub in enumerate(fields.get("allOf", [])):
+            explain(sub, instance, f"/allOf/{i}")
+
+        for kind in ("anyOf", "oneOf"):
+            if kind not in fields or output.full:
+                continue
+            subs: list[Schema] = fields[kind]
+            matches = [
+                i for i, sub in enumerate(subs)
+                if sub.validate(instance, prev_scope=scope)
+            ]
+            if len(matches) == 0:
+                units = list[dict]()
+                for i, sub in enumerate(subs):
+                    explain(sub, instance, f"/{kind}/{i}", units=units)
+                errors.append(output.errors(
+                    location.child("/" + kind),
+                    units,
+                    f"{render(instance)} is not valid against any subschema"
+                ))
+            elif kind == "oneOf" and len(matches) > 1:
+                errors.append(output.error(
+                    location.child("/oneOf"),
+                    f"{render(instance)} is valid against more than one"
+                    f" subschema: {render(matches)}"
+                ))
+
+        if "if" in fields:
+            if fields["if"].validate(instance, prev_scope=scope):
+                if "then" in fields:
+                    explain(fields["then"], instance, "/then")
+            elif "else" in fields:
+                explain(fields["else"], instance, "/else")
+
+        if isinstance(instance, list):
+            prefix_items: list[Schema] = fields.get("prefixItems", [])
+            for i, sub in enumerate(prefix_items[:len(instance)]):
+                explain(sub, instance[i], f"/prefixItems/{i}", f"/{i}")
+
+            if "items" in fields:
+                for i in range(len(prefix_items), len(instance)):
+                    explain(fields["items"], instance[i], "/items", f"/{i}")
+
+            if "contains" in fields and not output.full:
+                contains: Schema = fields["contains"]
+                min_contains: int = fields.get("minContains", 1)
+                max_contains: int = fields.get("maxContains", sys.maxsize)
+                count = sum(
+                    1 for item in instance
+                    if contains.validate(item, prev_scope=scope)
+                )
+                if count < min_contains:
+                    errors.append(output.error(
+                        location.child("/contains"),
+                        f"{render(instance)} has {count} matching items,"
+                        f" fewer than {min_contains}"
+                    ))
+                elif count > max_contains:
+                    errors.append(output.error(
+                        location.child("/contains"),
+                        f"{render(instance)} has {count} matching items,"
+                        f" more than {max_contains}"
+                    ))
+
+        if isinstance(instance, dict):
+            if "propertyNames" in fields:
+                for key in instance:
+                    explain(
+                        fields["propertyNames"],
+                        key,
+                        "/propertyNames",
+                        pointer_segment(key)
+                    )
+
+            for name, sub in fields.get("dependentSchemas", {}).items():
+                if name in instance:
+                    explain(
+                        sub,
+                        instance,
+                        "/dependentSchemas" + pointer_segment(name)
+                    )
+
+            properties: dict[str, Schema] = fields.get("properties", {})
+            pattern_properties = [
+                (pattern, ecma262.compile_pattern(pattern).search, sub)
+                for pattern, sub in fields.get(
+                    "patternProperties", {}
+                ).items()
+            ]
+            additional: Schema | None = fields.get("additionalProperties")
+
+            for key, value in instance.items():
+                evaluated = False
+                if key in properties:
+                    evaluated = True
+                    explain(
+                        properties[key],
+                        value,
+                        "/properties" + pointer_segment(key),
+                        pointer_segment(key)
+                    )
+                for pattern, search, sub in pattern_properties:
+                    if search(key) is not None:
+                        evaluated = True
+                        explain(
+                            sub,
+                            value,
+                            "/patternProperties" + pointer_segment(pattern),
+                            pointer_segment(key)
+                        )
+                if not evaluated and additional is not None:
+                    explain(
+                        additional,
+                        value,
+                        "/additionalProperties",
+                        pointer_segment(key)
+                    )
 
-            scope.evaluated_props.update(locally_evaluated_props)
+        return errors
 
 
 Vocabulary.by_uri[
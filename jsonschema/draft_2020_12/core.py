@@ -1,14 +1,24 @@
+from typing import MutableMapping
+from urllib.parse import unquote
+from ..output import Location, Output
 from ..vocabulary import (
-    Vocabulary, Schema, LexicalScope, DynamicScope
+    Vocabulary, Schema, LexicalScope, DynamicScope, Validator
 )
 
 
 class Core(Vocabulary):
+    # sets up the scope of a schema, which the other vocabularies rely on,
+    # whichever order a metaschema lists them in
+    order = -1
+    keywords = {
+        "_ref": ("$ref",),
+        "_dynamic_ref": ("$dynamicRef",),
+    }
 
     @staticmethod
     def on_schema_init(
         schema: Schema,
-        schema_by_uri: dict[str, "Schema | dict | bool"],
+        schema_by_uri: MutableMapping[str, "Schema | dict | bool"],
         refs: list
     ):
         if schema.parent is None or "$id" in schema.fields:
@@ -54,22 +64,26 @@ class Core(Vocabulary):
                     data=sub_schema,
                     parent=schema,
                     refs=refs,
-                    schema_by_uri=schema_by_uri
+                    schema_by_uri=schema_by_uri,
+                    defer=True
                 )
                 for name, sub_schema in schema.fields["$defs"].items()
             }
 
         if "$vocabulary" in schema.fields:
-            schema.fields["$vocabulary"] = {
-                Vocabulary.by_uri[k]
-                for k, v in schema.fields["$vocabulary"].items()
-                if v and k in Vocabulary.by_uri
-            }
+            schema.fields["$vocabulary"] = sorted(
+                (
+                    Vocabulary.by_uri[k]
+                    for k, v in schema.fields["$vocabulary"].items()
+                    if v and k in Vocabulary.by_uri
+                ),
+                key=lambda vocabulary: vocabulary.order
+            )
 
     # @staticmethod
     # def on_schema_post_init(
     #     schema: Schema,
-    #    schema_by_uri: dict[str, "Schema | dict | bool"]
+    #    schema_by_uri: MutableMapping[str, "Schema | dict | bool"]
     # ):
         if "$ref" in schema.fields:
             def f():
@@ -104,46 +118,244 @@ class Core(Vocabulary):
             refs.append(f)
 
     @staticmethod
-    def validate(
-        s: Schema,
-        instance,
-        scope: DynamicScope
-    ):
+    def in_place_subschemas(
+        s: Schema
+    ) -> list[Schema]:
+        subschemas = list[Schema]()
+
+        if "$ref" in s.fields:
+            ref = s.fields["$ref"]
+            if isinstance(ref, Schema):
+                subschemas.append(ref)
+
+        if "$dynamicRef" in s.fields:
+            dynamic_ref = s.fields["$dynamicRef"]
+            if isinstance(dynamic_ref, tuple):
+                ref, fragment = dynamic_ref
+                if isinstance(ref, Schema):
+                    subschemas.append(ref)
+
+        return subschemas
+
+    @staticmethod
+    def compile(
+        s: Schema
+    ) -> list[Validator]:
+        validators = list[Validator]()
+        annotate = s.annotate
+
         if "$ref" in s.fields:
             ref = s.fields["$ref"]
             assert isinstance(ref, Schema)
-            if not ref.validate(
-                instance=instance,
-                prev_scope=scope
-            ):
-                return False
+
+            if annotate:
+                def _ref(instance, scope: DynamicScope):
+                    return ref.validate(
+                        instance=instance,
+                        prev_scope=scope
+                    )
+            else:
+                ref_independent: bool | None = None
+
+                def _ref(instance, scope: DynamicScope):
+                    nonlocal ref_independent
+
+                    memo = scope.memo
+                    if memo is not None:
+                        if ref_independent is None:
+                            ref_independent = Core._scope_independent(ref)
+                        if ref_independent:
+                            return Core._memoized(ref, instance, scope, memo)
+
+                    return ref.validate(
+                        instance=instance,
+                        prev_scope=scope
+                    )
+            validators.append(_ref)
 
         if "$dynamicRef" in s.fields:
-            ref, fragment = s.fields["$dynamicRef"]
+            dynamic_ref, fragment = s.fields["$dynamicRef"]
 
+            anchor = None
             if fragment is not None:
-                ref_0 = Core._fragment_reference(
-                    s,
-                    fragment,
-                    dynamic_scope=scope
-                )
-                if ref_0 is not None:
-                    assert isinstance(ref_0, Schema)
-                    ref = ref_0
+                anchor = fragment[1:]
+                # the innermost scope is the one of this schema, so one of
+                # its plain anchors always wins; pointers never name anchors
+                if anchor in s.scope.anchors:
+                    dynamic_ref = s.scope.anchors[anchor]
+                    anchor = None
+                elif anchor == "" or anchor.startswith("/"):
+                    anchor = None
+
+            if anchor is None and not annotate:
+                target = dynamic_ref
+                assert isinstance(target, Schema)
+                independent: bool | None = None
+
+                def _dynamic_ref(instance, scope: DynamicScope):
+                    nonlocal independent
+
+                    memo = scope.memo
+                    if memo is not None:
+                        if independent is None:
+                            independent = Core._scope_independent(target)
+                        if independent:
+                            return Core._memoized(
+                                target, instance, scope, memo
+                            )
+
+                    return target.validate(
+                        instance=instance,
+                        prev_scope=scope
+                    )
+            elif anchor is None:
+                target = dynamic_ref
+                assert isinstance(target, Schema)
 
-            assert isinstance(ref, Schema)
+                def _dynamic_ref(instance, scope: DynamicScope):
+                    if not target.annotate:
+                        target.observe()
+
+                    return target.validate(
+                        instance=instance,
+                        prev_scope=scope
+                    )
+            else:
+                def _dynamic_ref(instance, scope: DynamicScope):
+                    ref = None
+                    chain = scope.anchor_chain()
+                    if chain is not None:
+                        ref = chain.resolve(anchor)
+                    if ref is None:
+                        ref = dynamic_ref
+
+                    assert isinstance(ref, Schema)
+
+                    # dynamic targets are only known here, at validation time
+                    if annotate and not ref.annotate:
+                        ref.observe()
+
+                    return ref.validate(
+                        instance=instance,
+                        prev_scope=scope
+                    )
+            validators.append(_dynamic_ref)
+
+        return validators
+
+    @staticmethod
+    def _memoized(
+        target: Schema,
+        instance,
+        scope: DynamicScope,
+        memo: dict
+    ) -> bool:
+        # a schema referred to from several places may see the same instance
+        # node more than once; its result is kept for the validation when it
+        # can't depend on the dynamic scope, and when the caller doesn't
+        # collect annotations
+        key = (target, id(instance))
+        result = memo.get(key)
+        if result is not None:
+            return result[1]
+        valid = target.validate(instance, prev_scope=scope)
+        # the node is kept, so that its id isn't reused
+        memo[key] = (instance, valid)
+        return valid
 
-            if not ref.validate(
-                instance=instance,
+    @staticmethod
+    def _scope_independent(schema: Schema) -> bool:
+        # whether no "$dynamicRef" resolved through the dynamic scope can be
+        # reached from the schema
+        seen = set[int]()
+        pending = [schema]
+
+        while len(pending) > 0:
+            s = pending.pop()
+            if id(s) in seen:
+                continue
+            seen.add(id(s))
+            s.build()
+
+            for k, v in s.fields.items():
+                if isinstance(v, Schema):
+                    pending.append(v)
+                elif isinstance(v, list):
+                    pending.extend(
+                        sub for sub in v if isinstance(sub, Schema)
+                    )
+                elif isinstance(v, dict):
+                    pending.extend(
+                        sub for sub in v.values() if isinstance(sub, Schema)
+                    )
+                elif k == "$dynamicRef":
+                    dynamic_ref, fragment = v
+                    if fragment is not None:
+                        anchor = fragment[1:]
+                        if (
+                            anchor not in s.scope.anchors
+                            and anchor != ""
+                            and not anchor.startswith("/")
+                        ):
+                            return False
+                    pending.append(dynamic_ref)
+
+        return True
+
+    @staticmethod
+    def explain(
+        s: Schema,
+        instance,
+        scope: DynamicScope,
+        location: Location,
+        output: Output
+    ) -> list[dict]:
+        targets = list[tuple[str, Schema]]()
+        if "$ref" in s.fields:
+            targets.append(("/$ref", s.fields["$ref"]))
+        if "$dynamicRef" in s.fields:
+            targets.append(("/$dynamicRef", Core._dynamic_target(s, scope)))
+
+        errors = list[dict]()
+        for keyword, target in targets:
+            if output.full:
+                break
+            if s.annotate and not target.annotate:
+                target.observe()
+            unit = target.explain(
+                instance,
+                output,
+                location.reference(keyword, target),
                 prev_scope=scope
-            ):
-                return False
+            )
+            if unit is not None:
+                errors.append(unit)
+        return errors
+
+    @staticmethod
+    def _dynamic_target(s: Schema, scope: DynamicScope) -> Schema:
+        # as resolved by the validator compiled for "$dynamicRef"
+        dynamic_ref, fragment = s.fields["$dynamicRef"]
+
+        if fragment is not None:
+            anchor = fragment[1:]
+            if anchor in s.scope.anchors:
+                return s.scope.anchors[anchor]
+            if anchor != "" and not anchor.startswith("/"):
+                chain = scope.anchor_chain()
+                if chain is not None:
+                    target = chain.resolve(anchor)
+                    if target is not None:
+                        return target
+
+        assert isinstance(dynamic_ref, Schema)
+        return dynamic_ref
 
     @staticmethod
     def _reference(
         schema: Schema,
         uri: str,
-        schema_by_uri: dict[str, "Schema | dict| bool"],
+        schema_by_uri: MutableMapping[str, "Schema | dict | bool"],
         scope: DynamicScope | None = None
     ) -> "Schema | None":
         try:
@@ -180,7 +392,8 @@ class Core(Vocabulary):
                 next_schema = Schema(
                     data=next_schema,
                     uri=uri,
-                    schema_by_uri=schema_by_uri
+                    schema_by_uri=schema_by_uri,
+                    lazy=schema.lazy
                 )
                 schema_by_uri[uri] = next_schema
 
@@ -209,6 +422,8 @@ class Core(Vocabulary):
         assert fragment.startswith("#")
         fragment = fragment[1:]
 
+        schema.build()
+
         if dynamic_scope is None:
             if fragment in schema.scope.anchors:
                 return schema.scope.anchors[fragment]
@@ -240,60 +455,76 @@ class Core(Vocabulary):
             # if fragment in self.scope.anchors:
             #    return self.scope.anchors[fragment]
 
-        def reference0(
-            path: list[str],
-            schema: Schema | list | dict,
-        ):
-            if len(path) == 0:
-                assert isinstance(schema, Schema)
-                return schema
-
-            p = path[0]
-            p_unpacked = list()
-
-            i = 0
-            while i < len(p):
-                ch = p[i]
-
-                if ch == "~":
-                    i += 1
-                    if p[i] == "0":
-                        ch = "~"
-                    elif p[i] == "1":
-                        ch = "/"
-                elif ch == "%":
-                    ch = chr(int(p[i+1:i+3], 16))
-                    i += 2
-
-                p_unpacked.append(ch)
-                i += 1
-
-            p = "".join(p_unpacked)
-
-            if p.isdigit():
-                assert isinstance(schema, list)
-                index = int(p)
-                if index < len(schema):
-                    return reference0(
-                        path[1:],
-                        schema=schema[index]
-                    )
-            else:
-                if isinstance(schema, dict):
-                    if p in schema:
-                        return reference0(
-                            path[1:],
-                            schema=schema[p]
-                        )
-                elif isinstance(schema, Schema):
-                    if p in schema.fields:
-                        return reference0(
-                            path[1:],
-                            schema=schema.fields[p]
-                        )
-            return None
-
-        return reference0(fragment.split("/")[1:], schema)
+        if "%" in fragment:
+            fragment = unquote(fragment)
+
+        scope = schema.scope
+        if schema is scope.root_schema:
+            if scope.pointers is None:
+                pointers = dict[str, Schema]()
+                Core._index_pointers(
+                    pointers, scope.deferred_pointers, "", schema
+                )
+                scope.pointers = pointers
+            pointers = scope.pointers
+            deferred = scope.deferred_pointers
+        else:
+            pointers = dict[str, Schema]()
+            deferred = list[tuple[str, Schema]]()
+            Core._index_pointers(pointers, deferred, "", schema)
+
+        while True:
+            target = pointers.get(fragment)
+            if target is not None:
+                return target
+
+            reached = [
+                (pointer, sub) for pointer, sub in deferred
+                if fragment.startswith(pointer + "/")
+            ]
+            if len(reached) == 0:
+                return None
+            for pointer, sub in reached:
+                deferred.remove((pointer, sub))
+                Core._index_pointers(pointers, deferred, pointer, sub.build())
+
+    @staticmethod
+    def _index_pointers(
+        pointers: dict[str, Schema],
+        deferred: list[tuple[str, Schema]],
+        pointer: str,
+        schema: Schema
+    ):
+        pending = [(pointer, schema)]
+
+        while len(pending) > 0:
+            pointer, schema = pending.pop()
+            pointers[pointer] = schema
+            if schema.deferred:
+                deferred.append((pointer, schema))
+                continue
+
+            for k, v in schema.fields.items():
+                # references point elsewhere, they don't contain subschemas
+                if k == "$ref" or k == "$dynamicRef":
+                    continue
+
+                if isinstance(v, Schema):
+                    subs = [("", v)]
+                elif isinstance(v, list):
+                    subs = [(f"/{i}", sub) for i, sub in enumerate(v)]
+                elif isinstance(v, dict):
+                    subs = [
+                        ("/" + name.replace("~", "~0").replace("/", "~1"), sub)
+                        for name, sub in v.items()
+                    ]
+                else:
+                    continue
+
+                key = pointer + "/" + k.replace("~", "~0").replace("/", "~1")
+                for suffix, sub in subs:
+                    if isinstance(sub, Schema) and sub.parent is schema:
+                        pending.append((key + suffix, sub))
 
 
 Vocabulary.by_uri["https://json-schema.org/draft/2020-12/vocab/core"] = Core
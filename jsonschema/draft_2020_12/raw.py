@@ -19,6 +19,8 @@ META = Schema(
 )
 
 
+# metaschemas are built on first use rather than on import, once for the
+# whole process
 schema_by_uri = dict()
 
 schema_by_uri["https://json-schema.org/draft/2020-12/meta/core"] = Schema({
@@ -68,7 +70,7 @@ schema_by_uri["https://json-schema.org/draft/2020-12/meta/core"] = Schema({
             "format": "uri-reference"
         }
     }
-}, meta_schema=META, schema_by_uri=schema_by_uri)
+}, meta_schema=META, schema_by_uri=schema_by_uri, defer=True)
 
 schema_by_uri["https://json-schema.org/draft/2020-12/meta/applicator"] = Schema({
     "$schema": "https://json-schema.org/draft/2020-12/schema",
@@ -114,7 +116,7 @@ schema_by_uri["https://json-schema.org/draft/2020-12/meta/applicator"] = Schema(
             "items": { "$dynamicRef": "#meta" }
         }
     }
-}, meta_schema=META, schema_by_uri=schema_by_uri)
+}, meta_schema=META, schema_by_uri=schema_by_uri, defer=True)
 
 schema_by_uri["https://json-schema.org/draft/2020-12/meta/unevaluated"] = Schema({
     "$schema": "https://json-schema.org/draft/2020-12/schema",
@@ -127,7 +129,7 @@ schema_by_uri["https://json-schema.org/draft/2020-12/meta/unevaluated"] = Schema
         "unevaluatedItems": { "$dynamicRef": "#meta" },
         "unevaluatedProperties": { "$dynamicRef": "#meta" }
     }
-}, meta_schema=META, schema_by_uri=schema_by_uri)
+}, meta_schema=META, schema_by_uri=schema_by_uri, defer=True)
 
 schema_by_uri["https://json-schema.org/draft/2020-12/meta/validation"] = Schema({
     "$schema": "https://json-schema.org/draft/2020-12/schema",
@@ -223,7 +225,7 @@ schema_by_uri["https://json-schema.org/draft/2020-12/meta/validation"] = Schema(
             "default": []
         }
     }
-}, meta_schema=META, schema_by_uri=schema_by_uri)
+}, meta_schema=META, schema_by_uri=schema_by_uri, defer=True)
 
 schema_by_uri["https://json-schema.org/draft/2020-12/meta/meta-data"] = Schema({
     "$schema": "https://json-schema.org/draft/2020-12/schema",
@@ -258,7 +260,7 @@ schema_by_uri["https://json-schema.org/draft/2020-12/meta/meta-data"] = Schema({
             "items": True
         }
     }
-}, meta_schema=META, schema_by_uri=schema_by_uri)
+}, meta_schema=META, schema_by_uri=schema_by_uri, defer=True)
 
 schema_by_uri["https://json-schema.org/draft/2020-12/meta/format-annotation"] = Schema({
     "$schema": "https://json-schema.org/draft/2020-12/schema",
@@ -270,7 +272,7 @@ schema_by_uri["https://json-schema.org/draft/2020-12/meta/format-annotation"] =
     "properties": {
         "format": { "type": "string" }
     }
-}, meta_schema=META, schema_by_uri=schema_by_uri)
+}, meta_schema=META, schema_by_uri=schema_by_uri, defer=True)
 
 schema_by_uri["https://json-schema.org/draft/2020-12/meta/content"] = Schema({
     "$schema": "https://json-schema.org/draft/2020-12/schema",
@@ -285,7 +287,7 @@ schema_by_uri["https://json-schema.org/draft/2020-12/meta/content"] = Schema({
         "contentMediaType": { "type": "string" },
         "contentSchema": { "$dynamicRef": "#meta" }
     }
-}, meta_schema=META, schema_by_uri=schema_by_uri)
+}, meta_schema=META, schema_by_uri=schema_by_uri, defer=True)
 
 schema_by_uri["https://json-schema.org/draft/2020-12/schema"] = Schema({
     "$schema": "https://json-schema.org/draft/2020-12/schema",
@@ -344,4 +346,4 @@ schema_by_uri["https://json-schema.org/draft/2020-12/schema"] = Schema({
             "deprecated": True
         }
     }
-}, meta_schema=META, schema_by_uri=schema_by_uri)
\ No newline at end of file
+}, meta_schema=META, schema_by_uri=schema_by_uri, defer=True)
\ No newline at end of file
@@ -1,63 +1,161 @@
-from ..vocabulary import Vocabulary, Schema, DynamicScope
+from typing import MutableMapping
+from ..output import Location, Output, pointer_segment
+from ..vocabulary import Vocabulary, Schema, DynamicScope, Validator
 
 
 class Unevaluated(Vocabulary):
+    order = 1
+    keywords = {
+        "_unevaluated_items": ("unevaluatedItems",),
+        "_unevaluated_properties": ("unevaluatedProperties",),
+    }
 
     @staticmethod
     def on_schema_init(
         schema: Schema,
-        schema_by_uri: dict[str, "Schema | dict | bool"],
+        schema_by_uri: MutableMapping[str, "Schema | dict | bool"],
         refs: list
     ):
         if "unevaluatedItems" in schema.fields:
             schema.fields["unevaluatedItems"] = Schema(
                 data=schema.fields["unevaluatedItems"],
-                parent=schema
+                parent=schema,
+                schema_by_uri=schema_by_uri,
+                refs=refs
             )
 
         if "unevaluatedProperties" in schema.fields:
             schema.fields["unevaluatedProperties"] = Schema(
                 data=schema.fields["unevaluatedProperties"],
-                parent=schema
+                parent=schema,
+                schema_by_uri=schema_by_uri,
+                refs=refs
             )
 
+        if (
+            "unevaluatedItems" in schema.fields
+            or "unevaluatedProperties" in schema.fields
+        ):
+            # annotations are followed through references, so the analysis
+            # is queued behind every reference of this construction
+            refs.append(lambda: refs.append(schema.observe))
+
+    @staticmethod
+    def compile(
+        s: Schema
+    ) -> list[Validator]:
+        validators = list[Validator]()
+
+        if "unevaluatedItems" in s.fields:
+            unevaluated_items: Schema = s.fields["unevaluatedItems"]
+
+            def _unevaluated_items(instance, scope: DynamicScope):
+                if not isinstance(instance, list):
+                    return True
+                evaluated_items = scope.evaluated_items
+                assert evaluated_items is not None
+                for index, item in enumerate(instance):
+                    if index not in evaluated_items:
+                        if not unevaluated_items.validate(
+                            instance=item,
+                            prev_scope=scope
+                        ):
+                            return False
+                        evaluated_items.add(index)
+                return True
+            validators.append(_unevaluated_items)
+
+        if "unevaluatedProperties" in s.fields:
+            unevaluated_props: Schema = s.fields["unevaluatedProperties"]
+
+            def _unevaluated_properties(instance, scope: DynamicScope):
+                if not isinstance(instance, dict):
+                    return True
+                evaluated_props = scope.evaluated_props
+                assert evaluated_props is not None
+                for key in instance:
+                    if key not in evaluated_props:
+                        if not unevaluated_props.validate(
+                            instance=instance[key],
+                            prev_scope=scope
+                        ):
+                            return False
+                        evaluated_props.add(key)
+                return True
+            validators.append(_unevaluated_properties)
+
+        return validators
+
     @staticmethod
-    def validate(
+    def explain(
         s: Schema,
         instance,
-        scope: DynamicScope
-    ):
-        if (
-            isinstance(instance, list)
-            and "unevaluatedItems" in s.fields
+        scope: DynamicScope,
+        location: Location,
+        output: Output
+    ) -> list[dict]:
+        unevaluated_items: Schema | None = s.fields.get("unevaluatedItems")
+        unevaluated_props: Schema | None = s.fields.get(
+            "unevaluatedProperties"
+        )
+        if not (
+            unevaluated_items is not None and isinstance(instance, list)
+            or unevaluated_props is not None and isinstance(instance, dict)
         ):
-            sub = s.fields["unevaluatedItems"]
-            assert isinstance(sub, Schema)
-
-            for index, item in enumerate(instance):
-                if index not in scope.evaluated_items:
-                    if not sub.validate(
-                        instance=item,
-                        prev_scope=scope,
-                    ):
-                        return False
-                    scope.evaluated_items.add(index)
+            return []
 
-        if (
-            isinstance(instance, dict)
-            and "unevaluatedProperties" in s.fields
-        ):
-            sub = s.fields["unevaluatedProperties"]
-            assert isinstance(sub, Schema)
-
-            for key in instance:
-                if key not in scope.evaluated_props:
-                    if not sub.validate(
-                        instance=instance[key],
-                        prev_scope=scope
-                    ):
-                        return False
-                    scope.evaluated_props.add(key)
+        # the annotations of the other keywords, collected as the validation
+        # of this schema does, though on a scope of their own; when one of
+        # them fails, it is what's reported, as its annotations are dropped
+        # and whatever it covers would look unevaluated
+        probe = DynamicScope(
+            s.scope,
+            prev_dynamic_scope=scope.prev_dynamic_scope,
+            instance=instance,
+            annotate=True
+        )
+        assert s.meta_schema is not None
+        for v in s.meta_schema.fields["$vocabulary"]:
+            assert issubclass(v, Vocabulary)
+            if v.order < Unevaluated.order:
+                for validator in v.compile(s):
+                    if not validator(instance, probe):
+                        return []
+
+        errors = list[dict]()
+        unevaluated = list[tuple[str, Schema, object]]()
+        if isinstance(instance, list) and unevaluated_items is not None:
+            assert probe.evaluated_items is not None
+            unevaluated.extend(
+                (pointer_segment(i), unevaluated_items, item)
+                for i, item in enumerate(instance)
+                if i not in probe.evaluated_items
+            )
+            keyword = "/unevaluatedItems"
+        else:
+            # the only other case the check above lets through
+            assert isinstance(instance, dict) and unevaluated_props is not None
+            assert probe.evaluated_props is not None
+            unevaluated.extend(
+                (pointer_segment(key), unevaluated_props, value)
+                for key, value in instance.items()
+                if key not in probe.evaluated_props
+            )
+            keyword = "/unevaluatedProperties"
+
+        for instance_location, sub, value in unevaluated:
+            if output.full:
+                break
+            unit = sub.explain(
+                value,
+                output,
+                location.child(keyword, instance_location),
+                prev_scope=scope
+            )
+            if unit is not None:
+                errors.append(unit)
+
+        return errors
 
 
 Vocabulary.by_uri[
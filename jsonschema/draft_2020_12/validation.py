@@ -1,131 +1,283 @@
 import numbers
-import re
-import itertools
 import math
-from ..vocabulary import Vocabulary, Schema, DynamicScope
+from .. import ecma262
+from ..output import Location, Output, pointer_segment, render
+from ..vocabulary import Vocabulary, Schema, DynamicScope, Validator
 
 
 class Validation(Vocabulary):
+    keywords = {
+        "_type_check": ("type",),
+        "_const": ("const",),
+        "_enum": ("enum",),
+        "_minimum": ("minimum",),
+        "_maximum": ("maximum",),
+        "_exclusive_maximum": ("exclusiveMaximum",),
+        "_exclusive_minimum": ("exclusiveMinimum",),
+        "_multiple_of": ("multipleOf",),
+        "_min_length": ("minLength",),
+        "_max_length": ("maxLength",),
+        "_pattern": ("pattern",),
+        "_min_items": ("minItems",),
+        "_max_items": ("maxItems",),
+        "_unique_items": ("uniqueItems",),
+        "_min_properties": ("minProperties",),
+        "_max_properties": ("maxProperties",),
+        "_required": ("required",),
+        "_dependent_required": ("dependentRequired",),
+    }
+    _MESSAGES = {
+        "type": "{instance} is not of type {value}",
+        "const": "{instance} is not {value}",
+        "enum": "{instance} is not one of {value}",
+        "minimum": "{instance} is less than {value}",
+        "maximum": "{instance} is greater than {value}",
+        "exclusiveMaximum": "{instance} is not less than {value}",
+        "exclusiveMinimum": "{instance} is not greater than {value}",
+        "multipleOf": "{instance} is not a multiple of {value}",
+        "minLength": "{instance} is shorter than {value} characters",
+        "maxLength": "{instance} is longer than {value} characters",
+        "pattern": "{instance} does not match {value}",
+        "minItems": "{instance} has fewer than {value} items",
+        "maxItems": "{instance} has more than {value} items",
+        "uniqueItems": "{instance} has duplicate items",
+        "minProperties": "{instance} has fewer than {value} properties",
+        "maxProperties": "{instance} has more than {value} properties",
+        "required": "{instance} is missing required properties {value}",
+        "dependentRequired": "{instance} is missing dependent properties",
+    }
 
     @staticmethod
-    def validate(
-        s: Schema,
-        instance,
-        scope: DynamicScope
-    ):
-        if "type" in s.fields:
-            _type = s.fields["type"]
-            if isinstance(_type, list):
-                if not any(Validation._check_type(t, instance) for t in _type):
-                    return False
-            else:
-                if not Validation._check_type(_type, instance):
-                    return False
-
-        if "const" in s.fields:
-            if not Validation._compare(instance, s.fields["const"]):
-                return False
+    def compile(
+        s: Schema
+    ) -> list[Validator]:
+        validators = list[Validator]()
+        fields = s.fields
 
-        if "enum" in s.fields:
-            enum: list = s.fields["enum"]
-            if instance not in enum:
-                return False
-            val = enum[enum.index(instance)]
+        if "type" in fields:
+            _type = fields["type"]
+            types: list[str] = _type if isinstance(_type, list) else [_type]
 
-            if not Validation._compare(instance, val):
+            def _type_check(instance, scope: DynamicScope):
+                for t in types:
+                    if Validation._check_type(t, instance):
+                        return True
                 return False
+            validators.append(_type_check)
 
-        if isinstance(instance, numbers.Real):
-            if "minimum" in s.fields and instance < s.fields["minimum"]:
-                return False
+        if "const" in fields:
+            const = Validation._canonical(fields["const"])
 
-            if "maximum" in s.fields and instance > s.fields["maximum"]:
-                return False
+            def _const(instance, scope: DynamicScope):
+                return Validation._canonical(instance) == const
+            validators.append(_const)
 
-            if (
-                "exclusiveMaximum" in s.fields
-                and instance >= s.fields["exclusiveMaximum"]
-            ):
-                return False
+        if "enum" in fields:
+            enum: list = fields["enum"]
+            # strings, the common case, are looked up without canonicalizing
+            enum_strings = frozenset(v for v in enum if isinstance(v, str))
+            enum_others = frozenset(
+                Validation._canonical(v)
+                for v in enum if not isinstance(v, str)
+            )
 
-            if (
-                "exclusiveMinimum" in s.fields
-                and instance <= s.fields["exclusiveMinimum"]
-            ):
-                return False
+            def _enum(instance, scope: DynamicScope):
+                if isinstance(instance, str):
+                    return instance in enum_strings
+                return (
+                    len(enum_others) > 0
+                    and Validation._canonical(instance) in enum_others
+                )
+            validators.append(_enum)
 
-            if "multipleOf" in s.fields:
-                multiple = s.fields["multipleOf"]
+        if "minimum" in fields:
+            minimum = fields["minimum"]
+
+            def _minimum(instance, scope: DynamicScope):
+                return not (
+                    isinstance(instance, numbers.Real) and instance < minimum
+                )
+            validators.append(_minimum)
+
+        if "maximum" in fields:
+            maximum = fields["maximum"]
+
+            def _maximum(instance, scope: DynamicScope):
+                return not (
+                    isinstance(instance, numbers.Real) and instance > maximum
+                )
+            validators.append(_maximum)
+
+        if "exclusiveMaximum" in fields:
+            exclusive_maximum = fields["exclusiveMaximum"]
+
+            def _exclusive_maximum(instance, scope: DynamicScope):
+                return not (
+                    isinstance(instance, numbers.Real)
+                    and instance >= exclusive_maximum
+                )
+            validators.append(_exclusive_maximum)
+
+        if "exclusiveMinimum" in fields:
+            exclusive_minimum = fields["exclusiveMinimum"]
+
+            def _exclusive_minimum(instance, scope: DynamicScope):
+                return not (
+                    isinstance(instance, numbers.Real)
+                    and instance <= exclusive_minimum
+                )
+            validators.append(_exclusive_minimum)
+
+        if "multipleOf" in fields:
+            multiple = fields["multipleOf"]
+
+            def _multiple_of(instance, scope: DynamicScope):
+                if not isinstance(instance, numbers.Real):
+                    return True
                 mod = instance % multiple
-                if not (
-                    mod == 0 or (multiple - mod) < 0.00001
-                ):
-                    return False
-
-        if isinstance(instance, str):
-            if (
-                "minLength" in s.fields
-                and len(instance) < s.fields["minLength"]
-            ):
-                return False
+                return mod == 0 or (multiple - mod) < 0.00001
+            validators.append(_multiple_of)
 
-            if (
-                "maxLength" in s.fields
-                and len(instance) > s.fields["maxLength"]
-            ):
-                return False
+        if "minLength" in fields:
+            min_length = fields["minLength"]
 
-            if (
-                "pattern" in s.fields
-                and not re.search(
-                    pattern=s.fields["pattern"],
-                    string=instance
+            def _min_length(instance, scope: DynamicScope):
+                return not (
+                    isinstance(instance, str) and len(instance) < min_length
                 )
-            ):
-                return False
+            validators.append(_min_length)
 
-        if isinstance(instance, list):
-            if (
-                "minItems" in s.fields
-                and len(instance) < s.fields["minItems"]
-            ):
-                return False
+        if "maxLength" in fields:
+            max_length = fields["maxLength"]
 
-            if (
-                "maxItems" in s.fields
-                and len(instance) > s.fields["maxItems"]
-            ):
-                return False
+            def _max_length(instance, scope: DynamicScope):
+                return not (
+                    isinstance(instance, str) and len(instance) > max_length
+                )
+            validators.append(_max_length)
 
-            if "uniqueItems" in s.fields and s.fields["uniqueItems"]:
-                for a, b in itertools.combinations(instance, 2):
-                    if Validation._compare(a, b):
+        if "pattern" in fields:
+            search = ecma262.compile_pattern(fields["pattern"]).search
+
+            def _pattern(instance, scope: DynamicScope):
+                return not isinstance(instance, str) or (
+                    search(instance) is not None
+                )
+            validators.append(_pattern)
+
+        if "minItems" in fields:
+            min_items = fields["minItems"]
+
+            def _min_items(instance, scope: DynamicScope):
+                return not (
+                    isinstance(instance, list) and len(instance) < min_items
+                )
+            validators.append(_min_items)
+
+        if "maxItems" in fields:
+            max_items = fields["maxItems"]
+
+            def _max_items(instance, scope: DynamicScope):
+                return not (
+                    isinstance(instance, list) and len(instance) > max_items
+                )
+            validators.append(_max_items)
+
+        if fields.get("uniqueItems", False):
+            def _unique_items(instance, scope: DynamicScope):
+                if not isinstance(instance, list):
+                    return True
+                seen = set()
+                for item in instance:
+                    key = Validation._canonical(item)
+                    if key in seen:
                         return False
+                    seen.add(key)
+                return True
+            validators.append(_unique_items)
 
-        if isinstance(instance, dict):
-            if (
-                "minProperties" in s.fields
-                and len(instance) < s.fields["minProperties"]
-            ):
-                return False
+        if "minProperties" in fields:
+            min_properties = fields["minProperties"]
 
-            if (
-                "maxProperties" in s.fields
-                and len(instance) > s.fields["maxProperties"]
-            ):
-                return False
+            def _min_properties(instance, scope: DynamicScope):
+                return not (
+                    isinstance(instance, dict)
+                    and len(instance) < min_properties
+                )
+            validators.append(_min_properties)
+
+        if "maxProperties" in fields:
+            max_properties = fields["maxProperties"]
+
+            def _max_properties(instance, scope: DynamicScope):
+                return not (
+                    isinstance(instance, dict)
+                    and len(instance) > max_properties
+                )
+            validators.append(_max_properties)
+
+        if "required" in fields:
+            required: list[str] = fields["required"]
 
-            if "required" in s.fields:
-                for key in s.fields["required"]:
+            def _required(instance, scope: DynamicScope):
+                if not isinstance(instance, dict):
+                    return True
+                for key in required:
                     if key not in instance:
                         return False
+                return True
+            validators.append(_required)
 
-            if "dependentRequired" in s.fields:
-                for key, required in s.fields["dependentRequired"].items():
+        if "dependentRequired" in fields:
+            dependent_required: dict[str, list[str]] \
+                = fields["dependentRequired"]
+
+            def _dependent_required(instance, scope: DynamicScope):
+                if not isinstance(instance, dict):
+                    return True
+                for key, required in dependent_required.items():
                     if key in instance:
                         for req in required:
                             if req not in instance:
                                 return False
+                return True
+            validators.append(_dependent_required)
+
+        return validators
+
+    @staticmethod
+    def explain(
+        s: Schema,
+        instance,
+        scope: DynamicScope,
+        location: Location,
+        output: Output
+    ) -> list[dict]:
+        errors = list[dict]()
+
+        for keyword, message in Validation._MESSAGES.items():
+            if keyword not in s.fields or output.full:
+                continue
+
+            value = s.fields[keyword]
+
+            # each keyword on its own, compiled as the whole schema is
+            view = Schema.__new__(Schema)
+            view.fields = {keyword: value}
+            for validator in Validation.compile(view):
+                if validator(instance, scope):
+                    continue
+                if keyword == "required":
+                    value = [k for k in value if k not in instance]
+                errors.append(output.error(
+                    location.child(pointer_segment(keyword)),
+                    message.format(
+                        instance=render(instance),
+                        value=render(value)
+                    )
+                ))
+
+        return errors
 
     @staticmethod
     def _check_type(type: str, instance):
@@ -163,29 +315,23 @@ class Validation(Vocabulary):
         return False
 
     @staticmethod
-    def _compare(a, b):
-        if (
-            type(a) is bool and type(b) is not bool or
-            type(b) is bool and type(a) is not bool
-        ):
-            return False
-
-        if isinstance(a, list) and isinstance(b, list):
-            if len(a) != len(b):
-                return False
-            for aa, bb in zip(a, b):
-                if not Validation._compare(aa, bb):
-                    return False
-            return True
-        elif isinstance(a, dict) and isinstance(b, dict):
-            if len(a) != len(b):
-                return False
-            for key in a:
-                if key not in b or not Validation._compare(a[key], b[key]):
-                    return False
-            return True
-        else:
-            return a == b
+    def _canonical(value):
+        # hashable key, equal for equal JSON values: numbers compare by
+        # value, booleans only to booleans, objects regardless of key order
+        match value:
+            case str() | None:
+                return value
+            case bool():
+                return ("boolean", value)
+            case int() | float():
+                return value
+            case list():
+                return ("array", *map(Validation._canonical, value))
+            case dict():
+                return ("object", frozenset(
+                    (k, Validation._canonical(v)) for k, v in value.items()
+                ))
+        return ("other", value)
 
 
 Vocabulary.by_uri[
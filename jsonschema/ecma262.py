@@ -0,0 +1,135 @@
+import re
+import sys
+from functools import lru_cache
+
+# WhiteSpace and LineTerminator code points of ECMA-262
+_SPACE_RANGES = (
+    (0x09, 0x0d), (0x20, 0x20), (0xa0, 0xa0), (0x1680, 0x1680),
+    (0x2000, 0x200a), (0x2028, 0x2029), (0x202f, 0x202f), (0x205f, 0x205f),
+    (0x3000, 0x3000), (0xfeff, 0xfeff)
+)
+_DIGIT_RANGES = ((0x30, 0x39),)
+_WORD_RANGES = ((0x30, 0x39), (0x41, 0x5a), (0x5f, 0x5f), (0x61, 0x7a))
+_LINE_TERMINATOR = "\\n\\r\\u2028\\u2029"
+
+# a quantifier in braces, any other "{" is a literal in ECMA-262
+_QUANTIFIER = re.compile(r"\{[0-9]+(,[0-9]*)?\}")
+
+
+def _members(ranges) -> str:
+    return "".join(
+        f"\\U{start:08x}" if start == end
+        else f"\\U{start:08x}-\\U{end:08x}"
+        for start, end in ranges
+    )
+
+
+def _complement(ranges) -> list[tuple[int, int]]:
+    result = list[tuple[int, int]]()
+    start = 0
+    for first, last in ranges:
+        if first > start:
+            result.append((start, first - 1))
+        start = last + 1
+    if start <= sys.maxunicode:
+        result.append((start, sys.maxunicode))
+    return result
+
+
+# class members by escape; negated ones are spelled out as the code points
+# they leave, so that they also nest into classes
+_CLASS_ESCAPES = {
+    "d": _members(_DIGIT_RANGES),
+    "D": _members(_complement(_DIGIT_RANGES)),
+    "w": _members(_WORD_RANGES),
+    "W": _members(_complement(_WORD_RANGES)),
+    "s": _members(_SPACE_RANGES),
+    "S": _members(_complement(_SPACE_RANGES)),
+}
+
+# escapes python reads differently than ECMA-262 and can't be translated
+_UNSUPPORTED_ESCAPES = {
+    "p": "Unicode property escapes are not supported",
+    "P": "Unicode property escapes are not supported",
+    "A": "\\A is not an anchor in ECMA-262, use ^",
+    "Z": "\\Z is not an anchor in ECMA-262, use $",
+}
+
+# process-wide, shared by every schema
+CACHE_SIZE = 4096
+
+
+def translate(pattern: str) -> str:
+    # raises re.error for patterns that can't be translated, so that invalid
+    # schemas fail while they are built rather than while validating
+    result = list[str]()
+    in_class = False
+    i = 0
+
+    while i < len(pattern):
+        ch = pattern[i]
+
+        if ch == "\\" and i + 1 < len(pattern):
+            esc = pattern[i + 1]
+            i += 2
+
+            if esc in _CLASS_ESCAPES:
+                chars = _CLASS_ESCAPES[esc]
+                result.append(chars if in_class else f"[{chars}]")
+            elif esc in _UNSUPPORTED_ESCAPES:
+                raise re.error(_UNSUPPORTED_ESCAPES[esc], pattern, i - 2)
+            elif esc == "c" and i < len(pattern) and pattern[i].isalpha():
+                result.append(f"\\x{ord(pattern[i]) % 32:02x}")
+                i += 1
+            elif esc == "k" and pattern.startswith("<", i):
+                end = pattern.index(">", i)
+                result.append(f"(?P={pattern[i + 1:end]})")
+                i = end + 1
+            elif esc == "/":
+                result.append("/")
+            else:
+                result.append("\\" + esc)
+            continue
+
+        if in_class:
+            if ch == "]":
+                in_class = False
+                result.append(ch)
+            elif ch in "[&~|":
+                # literals in ECMA-262, set operations in future pythons
+                result.append("\\" + ch)
+            else:
+                result.append(ch)
+        elif ch == "[":
+            if pattern.startswith("[^]", i):
+                result.append("[\\s\\S]")
+                i += 3
+                continue
+            if pattern.startswith("[]", i):
+                result.append("(?!)")
+                i += 2
+                continue
+            in_class = True
+            result.append(ch)
+        elif ch == ".":
+            result.append(f"[^{_LINE_TERMINATOR}]")
+        elif ch == "$":
+            result.append("\\Z")
+        elif ch == "{" and not _QUANTIFIER.match(pattern, i):
+            # python reads "{,n}" as a quantifier
+            result.append("\\{")
+        elif ch == "(" and pattern.startswith("?<", i + 1) \
+                and not pattern.startswith(("?<=", "?<!"), i + 1):
+            result.append("(?P<")
+            i += 3
+            continue
+        else:
+            result.append(ch)
+        i += 1
+
+    return "".join(result)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_pattern(pattern: str) -> re.Pattern:
+    return re.compile(translate(pattern), flags=re.ASCII)
@@ -0,0 +1,174 @@
+import json
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .schema import Schema
+
+FLAG = "flag"
+BASIC = "basic"
+DETAILED = "detailed"
+
+FORMATS = (FLAG, BASIC, DETAILED)
+
+# rendered values are cut, an error message isn't a copy of the instance
+_RENDER_LIMIT = 60
+
+
+def pointer_segment(name: str | int) -> str:
+    return "/" + str(name).replace("~", "~0").replace("/", "~1")
+
+
+def render(value) -> str:
+    text = json.dumps(value, default=repr, ensure_ascii=False)
+    if len(text) > _RENDER_LIMIT:
+        text = text[:_RENDER_LIMIT - 3] + "..."
+    return text
+
+
+def schema_path(
+    schema: "Schema",
+    resource: bool = True
+) -> list[str | int]:
+    # errors are rare, so the location of a schema within its resource, or
+    # within its whole document, is searched for rather than kept by every
+    # schema
+    segments = list[str | int]()
+
+    while schema.parent is not None and not (
+        resource and schema is schema.scope.root_schema
+    ):
+        parent = schema.parent
+        for k, v in parent.fields.items():
+            # references point elsewhere, they don't contain subschemas
+            if k == "$ref" or k == "$dynamicRef":
+                continue
+            if v is schema:
+                segments.append(k)
+                break
+            if isinstance(v, list) and any(sub is schema for sub in v):
+                index = next(i for i, sub in enumerate(v) if sub is schema)
+                segments.extend((index, k))
+                break
+            if isinstance(v, dict) and any(
+                sub is schema for sub in v.values()
+            ):
+                name = next(n for n, sub in v.items() if sub is schema)
+                segments.extend((name, k))
+                break
+        schema = parent
+
+    segments.reverse()
+    return segments
+
+
+def schema_pointer(schema: "Schema") -> str:
+    return "".join(map(pointer_segment, schema_path(schema)))
+
+
+def schema_location(schema: "Schema") -> str:
+    uri = schema.scope.root_schema.uri
+    return ("" if uri is None else uri) + "#" + schema_pointer(schema)
+
+
+class Location:
+    __slots__ = ("keyword", "absolute", "instance")
+
+    def __init__(
+        self,
+        keyword: str,
+        absolute: str | None,
+        instance: str
+    ):
+        self.keyword = keyword
+        self.absolute = absolute
+        self.instance = instance
+
+    @staticmethod
+    def of(schema: "Schema") -> "Location":
+        return Location("", Location._absolute(schema), "")
+
+    @staticmethod
+    def _absolute(schema: "Schema") -> str | None:
+        uri = schema.scope.root_schema.uri
+        if uri is None:
+            return None
+        return uri + "#" + schema_pointer(schema)
+
+    def child(
+        self,
+        keyword: str,
+        instance: str = ""
+    ) -> "Location":
+        return Location(
+            self.keyword + keyword,
+            None if self.absolute is None else self.absolute + keyword,
+            self.instance + instance
+        )
+
+    def reference(self, keyword: str, target: "Schema") -> "Location":
+        # the keyword location follows the path taken, the absolute one
+        # restarts at the schema referred to
+        target.build()
+        return Location(
+            self.keyword + keyword,
+            Location._absolute(target),
+            self.instance
+        )
+
+
+class Output:
+
+    def __init__(
+        self,
+        max_errors: int | None = None
+    ):
+        self.max_errors = max_errors
+        self.count = 0
+
+    @property
+    def full(self) -> bool:
+        return self.max_errors is not None and self.count >= self.max_errors
+
+    def error(self, location: Location, message: str) -> dict:
+        self.count += 1
+        unit = Output._unit(location)
+        unit["error"] = message
+        return unit
+
+    def errors(
+        self,
+        location: Location,
+        errors: list[dict],
+        message: str | None = None
+    ) -> dict:
+        unit = Output._unit(location)
+        if message is not None:
+            unit["error"] = message
+            if len(errors) == 0:
+                self.count += 1
+        if len(errors) > 0:
+            unit["errors"] = errors
+        return unit
+
+    @staticmethod
+    def _unit(location: Location) -> dict:
+        unit = {
+            "valid": False,
+            "keywordLocation": location.keyword,
+            "instanceLocation": location.instance,
+        }
+        if location.absolute is not None:
+            unit["absoluteKeywordLocation"] = location.absolute
+        return unit
+
+    @staticmethod
+    def basic(unit: dict) -> dict:
+        # the units carrying an error, without the schemas leading to them
+        errors = list[dict]()
+        pending = [unit]
+        while len(pending) > 0:
+            u = pending.pop()
+            if "error" in u:
+                errors.append({k: v for k, v in u.items() if k != "errors"})
+            pending.extend(reversed(u.get("errors", [])))
+        return {"valid": False, "errors": errors}
@@ -0,0 +1,217 @@
+import itertools
+import multiprocessing
+import time
+from multiprocessing.context import BaseContext
+from typing import Callable, Iterable, Iterator, MutableMapping, TypeVar
+from .registry import SchemaRegistry
+from .schema import Schema
+
+# the schema of the current process; with the "fork" start method it is
+# inherited from the parent instead of being rebuilt by every worker
+_data: dict | bool | None = None
+_schema: Schema | None = None
+# raised by the worker's tasks instead, as a pool starts workers failing
+# to initialize over and over
+_error: BaseException | None = None
+
+T = TypeVar("T")
+
+
+def _init_worker(
+    data: dict | bool,
+    schema_by_uri: "SchemaRegistry | dict[str, dict | bool]",
+    compiled: list[str]
+):
+    global _data, _schema, _error
+
+    if _data is data and _schema is not None:
+        return
+
+    try:
+        from .draft_2020_12 import raw
+
+        registry: MutableMapping[str, "Schema | dict | bool"]
+        if isinstance(schema_by_uri, SchemaRegistry):
+            registry = schema_by_uri
+            registry.update(raw.schema_by_uri)
+        else:
+            registry = dict(raw.schema_by_uri)
+            registry.update(schema_by_uri)
+
+        # rebuilt as in the parent, which registers the resources they
+        # embed again
+        for uri in compiled:
+            document = registry[uri]
+            if not isinstance(document, Schema):
+                registry[uri] = Schema(
+                    document,
+                    uri=uri,
+                    schema_by_uri=registry
+                )
+
+        _data = data
+        _schema = Schema(data, schema_by_uri=registry)
+    except BaseException as error:
+        _error = error
+
+
+def _worker_schema() -> Schema:
+    if _error is not None:
+        raise _error
+    assert _schema is not None
+    return _schema
+
+
+def _validate_chunk(chunk: list) -> list[bool]:
+    return list(_worker_schema().validate_many(chunk))
+
+
+def _validate_chunk_timed(chunk: list) -> list[tuple[bool, float]]:
+    return _timed(_worker_schema(), chunk)
+
+
+def _timed(schema: Schema, chunk: list) -> list[tuple[bool, float]]:
+    results = list[tuple[bool, float]]()
+    for instance in chunk:
+        start = time.perf_counter()
+        valid = schema.validate(instance)
+        results.append((valid, time.perf_counter() - start))
+    return results
+
+
+def _chunks(instances: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(instances)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+class ParallelValidator:
+
+    def __init__(
+        self,
+        data: dict | bool,
+        schema_by_uri: (
+            "MutableMapping[str, Schema | dict | bool] | None"
+        ) = None,
+        processes: int | None = None,
+        chunk_size: int = 1024,
+        context: BaseContext | None = None
+    ):
+        if schema_by_uri is None:
+            schema_by_uri = dict()
+
+        from .draft_2020_12 import raw
+
+        self.data = data
+        # compiled schemas don't pickle, workers rebuild the roots among
+        # them from the documents they were built from, and with them the
+        # resources they embed; metaschemas come with the draft
+        self.raw_schema_by_uri: SchemaRegistry | dict[str, dict | bool]
+        self.compiled_uris = list[str]()
+        if isinstance(schema_by_uri, SchemaRegistry):
+            # pickles without its compiled schemas
+            self.raw_schema_by_uri = schema_by_uri
+        else:
+            self.raw_schema_by_uri = dict()
+            for uri, value in schema_by_uri.items():
+                if uri in raw.schema_by_uri:
+                    continue
+                if not isinstance(value, Schema):
+                    self.raw_schema_by_uri[uri] = value
+                elif value.parent is None:
+                    self.raw_schema_by_uri[uri] = value.document()
+                    self.compiled_uris.append(uri)
+            schema_by_uri = dict(schema_by_uri)
+        self.schema = Schema(data, schema_by_uri=schema_by_uri)
+        self.processes = processes or multiprocessing.cpu_count()
+        self.chunk_size = chunk_size
+        self.context = context
+
+        self.documents = 0
+        self.failures = 0
+        self.seconds = 0.0
+
+        self._pool = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self):
+        global _data, _schema
+
+        if self._pool is not None or self.processes <= 1:
+            return
+
+        _data = self.data
+        _schema = self.schema
+
+        context = self.context or multiprocessing.get_context()
+        self._pool = context.Pool(
+            self.processes,
+            initializer=_init_worker,
+            initargs=(self.data, self.raw_schema_by_uri, self.compiled_uris)
+        )
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def validate(self, instances: Iterable) -> Iterator[bool]:
+        for valid in self._results(
+            instances,
+            _validate_chunk,
+            lambda chunk: list(self.schema.validate_many(chunk))
+        ):
+            self._count(valid)
+            yield valid
+
+    def validate_timed(
+        self,
+        instances: Iterable
+    ) -> Iterator[tuple[bool, float]]:
+        # with the seconds each document took
+        for valid, seconds in self._results(
+            instances,
+            _validate_chunk_timed,
+            lambda chunk: _timed(self.schema, chunk)
+        ):
+            self._count(valid)
+            yield valid, seconds
+
+    def _results(
+        self,
+        instances: Iterable,
+        in_worker: Callable[[list], list[T]],
+        in_process: Callable[[list], list[T]]
+    ) -> Iterator[T]:
+        self.start()
+
+        chunks = _chunks(instances, self.chunk_size)
+        if self._pool is not None:
+            results = self._pool.imap(in_worker, chunks)
+        else:
+            results = map(in_process, chunks)
+
+        start = time.perf_counter()
+        try:
+            for chunk_results in results:
+                yield from chunk_results
+        finally:
+            self.seconds += time.perf_counter() - start
+
+    def _count(self, valid: bool):
+        self.documents += 1
+        if not valid:
+            self.failures += 1
+
+    @property
+    def throughput(self) -> float:
+        if self.seconds == 0.0:
+            return 0.0
+        return self.documents / self.seconds
@@ -0,0 +1,196 @@
+import time
+from typing import TYPE_CHECKING, Callable
+from .output import pointer_segment, schema_location
+
+if TYPE_CHECKING:
+    from .schema import Schema
+    from .vocabulary import DynamicScope
+
+SORT_KEYS = ("calls", "failures", "cumulative", "own")
+
+
+class Stats:
+    __slots__ = ("calls", "failures", "cumulative", "own", "active")
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        # time spent until the outermost call returned, nested ones included
+        self.cumulative = 0.0
+        # time not spent in nested keywords
+        self.own = 0.0
+        self.active = 0
+
+    def as_dict(self, name: str) -> dict:
+        return {
+            "name": name,
+            "calls": self.calls,
+            "failures": self.failures,
+            "cumulative": self.cumulative,
+            "own": self.own,
+        }
+
+
+class Profiler:
+    # keeps track of the keyword running, so is used by one validation at a
+    # time; results add up across validations
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.perf_counter
+    ):
+        self.clock = clock
+        # by keyword location, e.g. "#/properties/items/items/$ref"
+        self.keywords = dict[str, Stats]()
+        # by vocabulary name, e.g. "Applicator"
+        self.vocabularies = dict[str, Stats]()
+        # by location of the schemas "$ref" and "$dynamicRef" lead to
+        self.references = dict[str, Stats]()
+        # the validators of a schema, as compiled when profiled, each with
+        # the stats of its keyword and vocabulary
+        self._plans = dict["Schema", tuple]()
+        # time spent in nested keywords, by running keyword
+        self._nested = list[float]()
+        # whether the schema validated next is the target of a reference
+        self._reference = False
+
+    def run(self, schema: "Schema", instance, scope: "DynamicScope") -> bool:
+        validators = schema.validators
+        entry = self._plans.get(schema)
+        if entry is None or entry[0] is not validators:
+            entry = self._plan(schema)
+        plan = entry[1]
+
+        clock = self.clock
+        nested = self._nested
+
+        target = None
+        target_start = 0.0
+        if self._reference:
+            self._reference = False
+            target = self._stats(self.references, schema_location(schema))
+            target.active += 1
+            target_start = clock()
+
+        valid = True
+        own_total = 0.0
+        try:
+            for validator, stats, vocabulary, reference in plan:
+                stats.active += 1
+                vocabulary.active += 1
+                nested.append(0.0)
+                self._reference = reference
+                start = clock()
+                try:
+                    valid = validator(instance, scope)
+                finally:
+                    elapsed = clock() - start
+                    self._reference = False
+                    own = elapsed - nested.pop()
+                    own_total += own
+                    if len(nested) > 0:
+                        nested[-1] += elapsed
+                    for s in (stats, vocabulary):
+                        s.calls += 1
+                        s.own += own
+                        s.active -= 1
+                        if s.active == 0:
+                            s.cumulative += elapsed
+                if not valid:
+                    stats.failures += 1
+                    vocabulary.failures += 1
+                    break
+        finally:
+            if target is not None:
+                elapsed = clock() - target_start
+                target.calls += 1
+                target.own += own_total
+                target.active -= 1
+                if target.active == 0:
+                    target.cumulative += elapsed
+                if not valid:
+                    target.failures += 1
+
+        return valid
+
+    def _plan(self, schema: "Schema") -> tuple:
+        from .vocabulary import Vocabulary
+
+        assert schema.meta_schema is not None
+        assert schema.validators is not None
+
+        vocabularies = schema.meta_schema.fields["$vocabulary"]
+        base = schema_location(schema)
+
+        plan = list[tuple]()
+        for validator in schema.validators:
+            name = getattr(validator, "__name__", repr(validator))
+            vocabulary: type[Vocabulary] | None = next(
+                (v for v in vocabularies if name in v.keywords),
+                None
+            )
+            keywords = list[str]()
+            if vocabulary is not None:
+                keywords = [
+                    k for k in vocabulary.keywords[name] if k in schema.fields
+                ]
+            if len(keywords) == 0:
+                keywords = [name]
+
+            location = base + "/" + ",".join(
+                pointer_segment(k)[1:] for k in keywords
+            )
+            plan.append((
+                validator,
+                self._stats(self.keywords, location),
+                self._stats(
+                    self.vocabularies,
+                    "?" if vocabulary is None else vocabulary.__name__
+                ),
+                keywords[0] in ("$ref", "$dynamicRef")
+            ))
+
+        entry = (schema.validators, tuple(plan))
+        self._plans[schema] = entry
+        return entry
+
+    @staticmethod
+    def _stats(stats: dict[str, Stats], name: str) -> Stats:
+        s = stats.get(name)
+        if s is None:
+            s = stats[name] = Stats()
+        return s
+
+    def report(
+        self,
+        by: str = "keywords",
+        sort: str = "own",
+        limit: int | None = None
+    ) -> list[dict]:
+        if by not in ("keywords", "vocabularies", "references"):
+            raise ValueError(f"unknown profile {by!r}")
+        if sort not in SORT_KEYS:
+            raise ValueError(f"unknown sort key {sort!r}")
+
+        rows = [s.as_dict(name) for name, s in getattr(self, by).items()]
+        rows.sort(key=lambda row: row[sort], reverse=True)
+        return rows if limit is None else rows[:limit]
+
+    def format(
+        self,
+        by: str = "keywords",
+        sort: str = "own",
+        limit: int | None = None
+    ) -> str:
+        rows = self.report(by, sort, limit)
+        lines = [
+            f"{'calls':>10} {'failures':>10} {'cumulative':>12}"
+            f" {'own':>12}  name"
+        ]
+        for row in rows:
+            lines.append(
+                f"{row['calls']:>10} {row['failures']:>10}"
+                f" {row['cumulative'] * 1000:>10.3f}ms"
+                f" {row['own'] * 1000:>10.3f}ms  {row['name']}"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,203 @@
+import collections
+import json
+import os
+from typing import Iterator, MutableMapping
+from .schema import Schema
+
+
+class SchemaRegistry(MutableMapping[str, "Schema | dict | bool"]):
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        base_uri: str = "http://localhost:1234/",
+        max_schemas: int | None = None,
+        lazy: bool = False
+    ):
+        self.max_schemas = max_schemas
+        self.lazy = lazy
+
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+
+        # least recently used first
+        self._compiled = collections.OrderedDict[str, Schema]()
+        self._raw = dict[str, dict | bool]()
+        self._paths = dict[str, str]()
+        # uris of resources embedded into another one, which is rebuilt
+        # to restore them after eviction
+        self._embedded = dict[str, str]()
+        # compiled schemas given to the registry, e.g. metaschemas, which it
+        # can't rebuild, so never evicts nor counts against max_schemas
+        self._pinned = set[str]()
+        self._building = set[str]()
+
+        if directory is not None:
+            self.index(directory, base_uri)
+
+    def index(self, directory: str, base_uri: str):
+        for dir_path, dirs, files in os.walk(directory):
+            for file_name in files:
+                if not file_name.endswith(".json"):
+                    continue
+                path = os.path.join(dir_path, file_name)
+                relative = os.path.relpath(path, directory)
+                uri = base_uri + relative.replace(os.sep, "/")
+                self._paths[uri] = path
+
+                # only the "$id" is kept, schemas are built on first lookup
+                with open(path) as f:
+                    data = json.load(f)
+                if isinstance(data, dict) and "$id" in data:
+                    self._paths[data["$id"].split("#")[0]] = path
+
+    def __getitem__(self, uri: str) -> "Schema | dict | bool":
+        schema = self._compiled.get(uri)
+        if schema is not None:
+            self.hits += 1
+            self._compiled.move_to_end(uri)
+            return schema
+
+        self.misses += 1
+
+        enclosing = self._enclosing(uri)
+        if enclosing is not None and enclosing not in self._building:
+            # rebuilding the enclosing resource registers this one again
+            self[enclosing]
+            if uri in self._compiled:
+                return self._compiled[uri]
+
+        if uri in self._raw:
+            data = self._raw[uri]
+        elif uri in self._paths:
+            with open(self._paths[uri]) as f:
+                data = json.load(f)
+            self.loads += 1
+        else:
+            raise KeyError(uri)
+
+        # a resource referring to itself while being built
+        if uri in self._building:
+            return data
+
+        self._building.add(uri)
+        try:
+            schema = Schema(
+                data,
+                uri=uri,
+                schema_by_uri=self,
+                lazy=self.lazy
+            )
+            self[uri] = schema
+        finally:
+            self._building.discard(uri)
+
+        return schema
+
+    def __setitem__(self, uri: str, value: "Schema | dict | bool"):
+        if not isinstance(value, Schema):
+            self._raw[uri] = value
+            self._compiled.pop(uri, None)
+            return
+
+        self._compiled[uri] = value
+        self._compiled.move_to_end(uri)
+
+        if uri in self._raw or uri in self._paths:
+            # rebuilt from its document
+            pass
+        elif uri not in self._embedded:
+            # an embedded resource or the "$id" of a root, registered before
+            # the root's own uri was set to it
+            root_uri = self._root(value).uri
+            if root_uri is not None and root_uri != uri:
+                self._embedded[uri] = root_uri
+            if self._enclosing(uri) is None:
+                self._embedded.pop(uri, None)
+                self._pinned.add(uri)
+
+        if self._over_budget():
+            self._evict()
+
+    def __delitem__(self, uri: str):
+        found = False
+        self._pinned.discard(uri)
+        for entries in (self._compiled, self._raw, self._paths):
+            if uri in entries:
+                del entries[uri]
+                found = True
+        if not found:
+            raise KeyError(uri)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(
+            dict.fromkeys([*self._compiled, *self._raw, *self._paths])
+        )
+
+    def __len__(self) -> int:
+        return len(set(self._compiled) | set(self._raw) | set(self._paths))
+
+    def __contains__(self, uri) -> bool:
+        return (
+            uri in self._compiled or uri in self._raw or uri in self._paths
+        )
+
+    def __getstate__(self):
+        # compiled schemas hold closures, the rest is rebuilt on demand
+        state = self.__dict__.copy()
+        state["_compiled"] = collections.OrderedDict()
+        state["_embedded"] = dict()
+        state["_pinned"] = set()
+        state["_building"] = set()
+        return state
+
+    @staticmethod
+    def _root(schema: Schema) -> Schema:
+        while schema.parent is not None:
+            schema = schema.parent
+        return schema
+
+    def _enclosing(self, uri: str) -> str | None:
+        # the resource to rebuild to restore an embedded one, if any
+        if uri not in self._embedded:
+            return None
+        seen = set[str]()
+        while uri in self._embedded and uri not in seen:
+            seen.add(uri)
+            uri = self._embedded[uri]
+        if uri in self._raw or uri in self._paths:
+            return uri
+        return None
+
+    def _over_budget(self) -> bool:
+        return (
+            self.max_schemas is not None
+            and len(self._compiled) - len(self._pinned) > self.max_schemas
+        )
+
+    def _evict(self):
+        for uri in list(self._compiled):
+            if not self._over_budget():
+                break
+
+            # embedded resources leave together with the one enclosing them,
+            # as they can only be restored by rebuilding it
+            schema = self._compiled.get(uri)
+            if (
+                schema is None
+                or uri in self._building
+                or uri not in self._raw and uri not in self._paths
+            ):
+                continue
+
+            root = self._root(schema)
+            # registered by a resource still being built
+            if root.validators is None and not root.deferred:
+                continue
+
+            for other, other_schema in list(self._compiled.items()):
+                if self._root(other_schema) is root:
+                    del self._compiled[other]
+                    self.evictions += 1
@@ -1,11 +1,21 @@
-from typing import TYPE_CHECKING
-from copy import deepcopy
+import sys
+import threading
+from typing import (
+    TYPE_CHECKING, Any, Iterable, Iterator, Literal, MutableMapping, overload
+)
 
 if TYPE_CHECKING:
-    from .vocabulary import DynamicScope
+    from .budget import Budget
+    from .output import Location, Output
+    from .profile import Profiler
+    from .vocabulary import AnchorChain, DynamicScope, Validator
 
 
 class LexicalScope:
+    __slots__ = (
+        "root_schema", "anchors", "dynamic_anchors", "pointers",
+        "deferred_pointers", "anchor_chain", "document"
+    )
 
     def __init__(
         self,
@@ -14,9 +24,58 @@ class LexicalScope:
         self.root_schema = root_schema
         self.anchors = dict[str, "Schema"]()
         self.dynamic_anchors = dict[str, "Schema"]()
+        # subschemas by JSON pointer from the root, built on first lookup;
+        # deferred subschemas are indexed once built
+        self.pointers: dict[str, "Schema"] | None = None
+        self.deferred_pointers = list[tuple[str, "Schema"]]()
+        # the chain made of this scope alone, see DynamicScope.anchor_chain
+        self.anchor_chain: "AnchorChain | None" = None
+        # the input a root schema was built from, see Schema.document
+        self.document: dict | None = None
+
+
+# deferred subschemas are built once, whichever thread reaches them first;
+# building one may resolve references into another, hence reentrant
+_build_lock = threading.RLock()
+
+_RESOURCE_KEYWORDS = ("$id", "$anchor", "$dynamicAnchor")
+
+
+def _copy(data: Any) -> Any:
+    # unlike deepcopy, this copies the values the input shares between
+    # several places separately, as each subschema rewrites its own fields
+    if isinstance(data, dict):
+        # keywords and property names repeat across schemas
+        return {sys.intern(k): _copy(v) for k, v in data.items()}
+    if isinstance(data, list):
+        return [_copy(v) for v in data]
+    return data
+
+
+def _find_resources(data, found: set[int]) -> bool:
+    # adds the ids of the values declaring some resource within them, in a
+    # single pass over a document, rather than one per subschema
+    has = False
+    if isinstance(data, dict):
+        has = any(keyword in data for keyword in _RESOURCE_KEYWORDS)
+        for value in data.values():
+            if _find_resources(value, found):
+                has = True
+    elif isinstance(data, list):
+        for value in data:
+            if _find_resources(value, found):
+                has = True
+    if has:
+        found.add(id(data))
+    return has
 
 
 class Schema:
+    __slots__ = (
+        "parent", "uri", "meta_schema", "fields", "scope", "validators",
+        "annotate", "lazy", "_deferred", "_resources"
+    )
+
     scope: LexicalScope
 
     def __init__(
@@ -26,8 +85,12 @@ class Schema:
         should_not_have_meta=False,
         parent: "Schema | None" = None,
         uri: str | None = None,
-        schema_by_uri: dict[str, "Schema | dict | bool"] | None = None,
-        refs: list | None = None
+        schema_by_uri: (
+            "MutableMapping[str, Schema | dict | bool] | None"
+        ) = None,
+        refs: list | None = None,
+        lazy: bool = False,
+        defer: bool = False
     ):
         if schema_by_uri is None:
             schema_by_uri = dict()
@@ -38,10 +101,21 @@ class Schema:
             else:
                 data = {"not": {}}
 
-        from .vocabulary import Vocabulary
-
         self.parent = parent
         self.uri = uri
+        self.validators: "tuple[Validator, ...] | None" = None
+        # whether evaluated properties/items of this schema are observable by
+        # some "unevaluated*" keyword, see Schema.observe
+        self.annotate = False
+        # subschemas of lazy schemas may be deferred, see Schema.build
+        self.lazy = lazy or parent is not None and parent.lazy
+        # arguments of a deferred schema, empty while it is being built
+        self._deferred: tuple | None = None
+        # ids of the parts of a lazy document declaring resources, which
+        # are built right away, see _find_resources
+        self._resources: set[int] | None = (
+            None if parent is None else parent._resources
+        )
 
         if meta_schema is None:
             if should_not_have_meta:
@@ -55,7 +129,7 @@ class Schema:
                         uri=_meta_uri,
                         schema_by_uri=schema_by_uri
                     )
-                meta_schema = _meta_schema
+                meta_schema = _meta_schema.build()
             elif parent is not None:
                 meta_schema = parent.meta_schema
             else:
@@ -64,7 +138,36 @@ class Schema:
 
         self.meta_schema = meta_schema
 
-        self.fields = deepcopy(data)
+        # a deferred root is reached through the uri it's registered with;
+        # nested resources are built right away, so that they can be found
+        # by their uri or anchor
+        if defer and (
+            parent is None
+            or self.lazy and self._resources is not None
+            and id(data) not in self._resources
+        ):
+            self.fields = data
+            self._deferred = (data, schema_by_uri)
+            return
+
+        self._init(data, schema_by_uri, refs)
+
+    def _init(
+        self,
+        data: dict,
+        schema_by_uri: "MutableMapping[str, Schema | dict | bool]",
+        refs: list | None
+    ):
+        from .vocabulary import Vocabulary
+
+        # the root copies the input once, subschemas get their part of it
+        if self.parent is None:
+            self.fields = _copy(data)
+            if self.lazy:
+                self._resources = set[int]()
+                _find_resources(self.fields, self._resources)
+        else:
+            self.fields = data
 
         if self.meta_schema is not None:
             if refs is None:
@@ -81,33 +184,294 @@ class Schema:
                     refs=refs
                 )
 
+            if self.parent is None:
+                self.scope.document = data
+
+            # keyword handlers bind resolved references, so the plan is built
+            # after this schema's own references were resolved
+            refs.append(self.compile)
+
             if post:
                 for r in refs:
                     r()
 
+    def compile(self) -> "Schema":
+        from .vocabulary import Vocabulary
+
+        assert self.meta_schema is not None
+
+        validators = list["Validator"]()
+        for v in self.meta_schema.fields["$vocabulary"]:
+            assert issubclass(v, Vocabulary)
+            validators.extend(v.compile(self))
+        # kept for the lifetime of the schema, so without spare capacity
+        self.validators = tuple(validators)
+
+        return self
+
+    @property
+    def deferred(self) -> bool:
+        return bool(self._deferred)
+
+    def document(self) -> dict | bool:
+        from .output import schema_path
+
+        # the part of its root's input this schema was built from, e.g. to
+        # rebuild it in another process
+        if self._deferred:
+            return self.fields
+
+        path = schema_path(self, resource=False)
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        document: Any = root.scope.document
+        assert document is not None
+        for key in path:
+            document = document[key]
+        return document
+
+    def build(self) -> "Schema":
+        with _build_lock:
+            deferred = self._deferred
+            if not deferred:
+                return self
+            self._deferred = ()
+
+            data, schema_by_uri = deferred
+            # observed before being built, its subschemas are observed now
+            annotate = self.annotate
+            self.annotate = False
+
+            self._init(data, schema_by_uri, refs=None)
+            if annotate:
+                self.observe()
+
+            self._deferred = None
+
+        return self
+
+    def observe(self):
+        with _build_lock:
+            self._observe()
+
+    def _observe(self):
+        from .vocabulary import Vocabulary
+
+        pending: list[Schema] = [self]
+
+        while len(pending) > 0:
+            schema = pending.pop()
+            if schema.annotate:
+                continue
+            schema.annotate = True
+            if schema._deferred:
+                continue
+
+            assert schema.meta_schema is not None
+
+            for v in schema.meta_schema.fields["$vocabulary"]:
+                assert issubclass(v, Vocabulary)
+                pending.extend(v.in_place_subschemas(schema))
+
+            if schema.validators is not None:
+                schema.compile()
+
     def validate(
         self,
         instance,
-        prev_scope: "DynamicScope | None" = None
+        prev_scope: "DynamicScope | None" = None,
+        profiler: "Profiler | None" = None,
+        budget: "Budget | None" = None,
+        memoize: bool = False
     ):
-        from .vocabulary import Vocabulary, DynamicScope
+        if self._deferred is not None:
+            self.build()
+
+        annotate = self.annotate
+        if (
+            not annotate
+            and prev_scope is not None
+            and prev_scope.lexical_scope is self.scope
+        ):
+            # without annotations to keep apart, a scope is only needed where
+            # a resource boundary is crossed
+            scope = prev_scope
+        else:
+            # imported here, the scope reused above is the common case
+            from .vocabulary import DynamicScope
 
-        scope = DynamicScope(self.scope, prev_dynamic_scope=prev_scope)
+            scope = DynamicScope(
+                self.scope,
+                prev_dynamic_scope=prev_scope,
+                instance=instance,
+                annotate=annotate
+            )
+            if prev_scope is None and memoize:
+                # pays off where schemas are referred to from several
+                # places that apply to the same instance node
+                scope.memo = dict()
+            if budget is not None:
+                if profiler is not None:
+                    raise ValueError("profilers of budgets are given to them")
+                scope.monitor = budget
+            elif profiler is not None:
+                scope.monitor = profiler
+
+        assert self.validators is not None
+
+        # nested schemas are monitored through the scope they're given
+        monitor = scope.monitor
+        if monitor is not None:
+            if not monitor.run(self, instance, scope):
+                return False
+        else:
+            for validator in self.validators:
+                if not validator(instance, scope):
+                    return False
+
+        if (
+            annotate
+            and prev_scope is not None
+            and prev_scope.instance is instance
+        ):
+            if (
+                scope.evaluated_props is not None
+                and prev_scope.evaluated_props is not None
+            ):
+                prev_scope.evaluated_props.update(scope.evaluated_props)
+            if (
+                scope.evaluated_items is not None
+                and prev_scope.evaluated_items is not None
+            ):
+                prev_scope.evaluated_items.update(scope.evaluated_items)
+
+        return True
+
+    def evaluate(
+        self,
+        instance,
+        format: str = "flag",
+        max_errors: int | None = None
+    ) -> dict:
+        from .output import FLAG, BASIC, FORMATS, Location, Output
+
+        if format not in FORMATS:
+            raise ValueError(f"unknown output format {format!r}")
+
+        # errors are only looked for once the instance is known to fail
+        valid = self.validate(instance)
+        if valid or format == FLAG:
+            return {"valid": valid}
+
+        output = Output(max_errors)
+        unit = self.explain(instance, output, Location.of(self))
+        assert unit is not None
+
+        if format == BASIC:
+            return Output.basic(unit)
+        return unit
+
+    def explain(
+        self,
+        instance,
+        output: "Output",
+        location: "Location",
+        prev_scope: "DynamicScope | None" = None
+    ) -> dict | None:
+        from .output import render
+        from .vocabulary import DynamicScope, Vocabulary
+
+        if self.validate(instance, prev_scope=prev_scope):
+            return None
+
+        fields = self.fields
+        if (
+            len(fields) == 1 and "not" in fields
+            and len(fields["not"].fields) == 0
+        ):
+            # the false schema
+            return output.error(location, f"{render(instance)} is not allowed")
+
+        scope = DynamicScope(
+            self.scope,
+            prev_dynamic_scope=prev_scope,
+            instance=instance,
+            annotate=self.annotate
+        )
 
         assert self.meta_schema is not None
 
+        errors = list[dict]()
         for v in self.meta_schema.fields["$vocabulary"]:
             assert issubclass(v, Vocabulary)
-            result = v.validate(
-                self,
-                instance,
-                scope
-            )
-            if result is False:
-                return False
+            if output.full:
+                break
+            errors.extend(v.explain(self, instance, scope, location, output))
 
-        if prev_scope is not None:
-            prev_scope.evaluated_props.update(scope.evaluated_props)
-            prev_scope.evaluated_items.update(scope.evaluated_items)
+        if len(errors) == 0 and not output.full:
+            return output.error(location, f"{render(instance)} is not valid")
+        return output.errors(location, errors)
 
-        return True
+    @overload
+    def validate_many(
+        self,
+        instances: Iterable,
+        with_index: Literal[False] = False,
+        stop_on_failure: bool = False,
+        memoize: bool = False
+    ) -> Iterator[bool]: ...
+
+    @overload
+    def validate_many(
+        self,
+        instances: Iterable,
+        with_index: Literal[True],
+        stop_on_failure: bool = False,
+        memoize: bool = False
+    ) -> Iterator[tuple[int, bool]]: ...
+
+    def validate_many(
+        self,
+        instances: Iterable,
+        with_index: bool = False,
+        stop_on_failure: bool = False,
+        memoize: bool = False
+    ) -> "Iterator[bool | tuple[int, bool]]":
+        from .vocabulary import DynamicScope
+
+        if self._deferred is not None:
+            self.build()
+
+        validators = self.validators
+        assert validators is not None
+
+        # one root scope serves every document; only its annotations reset
+        scope = DynamicScope(self.scope, prev_dynamic_scope=None)
+        memo = None
+        if memoize:
+            memo = scope.memo = dict()
+        evaluated_props = None
+        evaluated_items = None
+        if self.annotate:
+            evaluated_props = scope.evaluated_props = set[str]()
+            evaluated_items = scope.evaluated_items = set[int]()
+
+        for index, instance in enumerate(instances):
+            scope.instance = instance
+            if memo:
+                memo.clear()
+            if evaluated_props is not None and evaluated_items is not None:
+                evaluated_props.clear()
+                evaluated_items.clear()
+
+            valid = True
+            for validator in validators:
+                if not validator(instance, scope):
+                    valid = False
+                    break
+
+            yield (index, valid) if with_index else valid
+
+            if not valid and stop_on_failure:
+                return
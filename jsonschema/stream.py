@@ -0,0 +1,503 @@
+import codecs
+import json
+import re
+import sys
+from typing import Any, Generator, Iterable, Iterator
+from . import ecma262
+from .draft_2020_12.applicator import Applicator
+from .draft_2020_12.validation import Validation
+from .schema import Schema
+from .vocabulary import DynamicScope
+
+START_OBJECT = "start_object"
+KEY = "key"
+END_OBJECT = "end_object"
+START_ARRAY = "start_array"
+END_ARRAY = "end_array"
+VALUE = "value"
+
+Event = tuple[str, Any]
+Consumer = Generator[None, Event, Any]
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_CHARS = re.compile(r"[-+.eE0-9]*")
+_NUMBER = re.compile(r"-?(?:0|[1-9][0-9]*)(\.[0-9]+)?([eE][+-]?[0-9]+)?")
+_LITERALS = {"true": True, "false": False, "null": None}
+
+# scans a string from its opening quote
+_scan_string = json.JSONDecoder().raw_decode
+
+# keywords that need the whole instance, so their subtree is buffered
+_BUFFERED = frozenset((
+    "const", "enum", "unevaluatedItems", "unevaluatedProperties",
+    "$dynamicRef"
+))
+
+# the keywords streamed by _value, applied only where the metaschema lists
+# their vocabulary
+_VOCABULARY_KEYWORDS = tuple(
+    (v, frozenset(k for names in v.keywords.values() for k in names))
+    for v in (Applicator, Validation)
+)
+
+
+def events(chunks: Iterable[str | bytes]) -> Iterator[Event]:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    buf = ""
+    pos = 0
+    eof = False
+    # "value", "first_value", "key", "first_key", "colon", "comma", "done"
+    expect = "value"
+    stack = list[str]()
+
+    while True:
+        pos = _match_end(_WHITESPACE, buf, pos)
+        incomplete = pos == len(buf)
+        # only a closing quote can complete a string, so chunks without one
+        # are put aside rather than scanned again
+        in_string = False
+
+        if not incomplete:
+            ch = buf[pos]
+
+            if expect == "done":
+                raise ValueError(f"extra data at {pos}")
+
+            if expect == "colon":
+                if ch != ":":
+                    raise ValueError(f"expected ':' at {pos}")
+                pos += 1
+                expect = "value"
+                continue
+
+            if expect in ("comma", "first_key", "first_value"):
+                end = "}" if stack[-1] == START_OBJECT else "]"
+                if ch == end:
+                    pos += 1
+                    stack.pop()
+                    yield (END_OBJECT if end == "}" else END_ARRAY, None)
+                    expect = "comma" if len(stack) > 0 else "done"
+                    continue
+                if expect == "comma":
+                    if ch != ",":
+                        raise ValueError(f"expected ',' or '{end}' at {pos}")
+                    pos += 1
+                    expect = "key" if end == "}" else "value"
+                    continue
+                expect = "key" if expect == "first_key" else "value"
+
+            if expect == "key":
+                if ch != "\"":
+                    raise ValueError(f"expected property name at {pos}")
+                try:
+                    key, end_pos = _scan_string(buf, pos)
+                except json.JSONDecodeError as error:
+                    if eof or not _cut(error, len(buf)):
+                        raise
+                    incomplete = in_string = True
+                else:
+                    pos = end_pos
+                    yield (KEY, key)
+                    expect = "colon"
+                    continue
+
+            elif ch == "{":
+                pos += 1
+                stack.append(START_OBJECT)
+                yield (START_OBJECT, None)
+                expect = "first_key"
+                continue
+
+            elif ch == "[":
+                pos += 1
+                stack.append(START_ARRAY)
+                yield (START_ARRAY, None)
+                expect = "first_value"
+                continue
+
+            elif ch == "\"":
+                try:
+                    value, end_pos = _scan_string(buf, pos)
+                except json.JSONDecodeError as error:
+                    if eof or not _cut(error, len(buf)):
+                        raise
+                    incomplete = in_string = True
+                else:
+                    pos = end_pos
+                    yield (VALUE, value)
+                    expect = "comma" if len(stack) > 0 else "done"
+                    continue
+
+            elif ch in "-0123456789":
+                end_pos = _match_end(_NUMBER_CHARS, buf, pos)
+                if end_pos < len(buf) or eof:
+                    match = _NUMBER.fullmatch(buf, pos, end_pos)
+                    if match is None:
+                        raise ValueError(f"invalid number at {pos}")
+                    pos = end_pos
+                    if match.group(1) or match.group(2):
+                        yield (VALUE, float(match.group()))
+                    else:
+                        yield (VALUE, int(match.group()))
+                    expect = "comma" if len(stack) > 0 else "done"
+                    continue
+                incomplete = True
+
+            else:
+                for literal, value in _LITERALS.items():
+                    if buf.startswith(literal, pos):
+                        pos += len(literal)
+                        yield (VALUE, value)
+                        expect = "comma" if len(stack) > 0 else "done"
+                        break
+                    if (
+                        not eof and pos + len(literal) > len(buf)
+                        and literal.startswith(buf[pos:])
+                    ):
+                        incomplete = True
+                        break
+                else:
+                    raise ValueError(f"unexpected {ch!r} at {pos}")
+                if not incomplete:
+                    continue
+
+        if incomplete:
+            if eof:
+                if expect != "done":
+                    raise ValueError("unexpected end of data")
+                return
+
+            parts = [buf[pos:]]
+            while True:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    eof = True
+                    chunk = decoder.decode(b"", final=True)
+                elif isinstance(chunk, bytes):
+                    chunk = decoder.decode(chunk)
+                parts.append(chunk)
+                if eof or not in_string or "\"" in chunk:
+                    break
+            buf = "".join(parts)
+            pos = 0
+
+
+def _match_end(pattern: re.Pattern, buf: str, pos: int) -> int:
+    # of patterns matching the empty string too
+    match = pattern.match(buf, pos)
+    assert match is not None
+    return match.end()
+
+
+def _cut(error: json.JSONDecodeError, length: int) -> bool:
+    # whether a string failed to scan only because the data read so far
+    # ends within it, rather than for being invalid
+    if error.msg.startswith("Unterminated string"):
+        return True
+    # a "\uXXXX" escape, from its "u", with fewer than four digits left
+    return error.msg.startswith("Invalid \\uXXXX") and length - error.pos < 5
+
+
+def validate_events(schema: Schema, source: Iterable[Event]) -> bool:
+    consumer = _value(schema, None)
+    next(consumer)
+
+    source = iter(source)
+    for event in source:
+        stop = _send(consumer, event)
+        if stop is not None:
+            # drains the source, so malformed trailing data is reported
+            for event in source:
+                raise ValueError(f"unexpected {event[0]} after the instance")
+            return stop.value
+
+    raise ValueError("unexpected end of events")
+
+
+def validate_stream(schema: Schema, chunks: Iterable[str | bytes]) -> bool:
+    return validate_events(schema, events(chunks))
+
+
+def _send(consumer: Consumer, event: Event):
+    try:
+        consumer.send(event)
+    except StopIteration as stop:
+        return stop
+    return None
+
+
+def _skip(depth: int = 0) -> Consumer:
+    while True:
+        event, _ = yield
+        if event == START_OBJECT or event == START_ARRAY:
+            depth += 1
+        elif event == END_OBJECT or event == END_ARRAY:
+            depth -= 1
+        if depth == 0:
+            return True
+
+
+def _build() -> Consumer:
+    _nothing = object()
+    containers = list[list]()
+
+    while True:
+        event, data = yield
+        value: Any = _nothing
+
+        if event == VALUE:
+            value = data
+        elif event == START_OBJECT:
+            containers.append([dict(), None])
+        elif event == START_ARRAY:
+            containers.append([list(), None])
+        elif event == KEY:
+            containers[-1][1] = data
+        else:
+            value = containers.pop()[0]
+
+        if value is not _nothing:
+            if len(containers) == 0:
+                return value
+            container, key = containers[-1]
+            if isinstance(container, dict):
+                container[key] = value
+            else:
+                container.append(value)
+
+
+def _all(consumers: list[Consumer]) -> Consumer:
+    # feeds the events of one value to every consumer, which all finish
+    # on its last event
+    for consumer in consumers:
+        next(consumer)
+
+    results = list[Any]()
+    while True:
+        event = yield
+        for consumer in consumers:
+            stop = _send(consumer, event)
+            if stop is not None:
+                results.append(stop.value)
+        if len(results) > 0:
+            return results
+
+
+def _type_allows(fields: dict, name: str):
+    _type = fields.get("type")
+    if _type is None:
+        return True
+    if isinstance(_type, list):
+        return name in _type
+    return _type == name
+
+
+def _value(schema: Schema, prev_scope: DynamicScope | None) -> Consumer:
+    event, data = yield
+
+    if event == VALUE:
+        return schema.validate(data, prev_scope=prev_scope)
+
+    fields = schema.build().fields
+    if schema.meta_schema is not None:
+        vocabularies = schema.meta_schema.fields["$vocabulary"]
+        for vocabulary, keywords in _VOCABULARY_KEYWORDS:
+            if vocabulary not in vocabularies:
+                fields = {
+                    k: v for k, v in fields.items() if k not in keywords
+                }
+
+    if not _BUFFERED.isdisjoint(fields) or fields.get("uniqueItems", False):
+        builder = _build()
+        next(builder)
+        stop = _send(builder, (event, data))
+        while stop is None:
+            stop = _send(builder, (yield))
+        return schema.validate(stop.value, prev_scope=prev_scope)
+
+    is_object = event == START_OBJECT
+    scope = DynamicScope(schema.scope, prev_dynamic_scope=prev_scope)
+
+    if not _type_allows(fields, "object" if is_object else "array"):
+        yield from _skip(1)
+        return False
+
+    # in-place applicators see the same events as this schema
+    checks = list[tuple[str, int, int, Any]]()
+    consumers = list[Consumer]()
+
+    def in_place(kind: str, subs: list[Schema], extra=None):
+        start = len(consumers)
+        consumers.extend(_value(sub, scope) for sub in subs)
+        checks.append((kind, start, len(consumers), extra))
+
+    if "$ref" in fields:
+        in_place("allOf", [fields["$ref"]])
+    for kind in ("allOf", "anyOf", "oneOf"):
+        if kind in fields:
+            in_place(kind, fields[kind])
+    if "not" in fields:
+        in_place("not", [fields["not"]])
+    if "if" in fields:
+        subs = [fields["if"]]
+        for k in ("then", "else"):
+            if k in fields:
+                subs.append(fields[k])
+        in_place("if", subs, ("then" in fields, "else" in fields))
+    if is_object and "dependentSchemas" in fields:
+        for name, sub in fields["dependentSchemas"].items():
+            in_place("dependentSchemas", [sub], name)
+
+    shared = None
+    if len(consumers) > 0:
+        shared = _all(consumers)
+        next(shared)
+        shared.send((event, data))
+
+    count = 0
+    contained = 0
+    keys = None
+    if is_object and (
+        "required" in fields or "dependentRequired" in fields
+        or "dependentSchemas" in fields
+    ):
+        keys = set[str]()
+
+    properties: dict[str, Schema] = fields.get("properties", {})
+    pattern_properties = [
+        (ecma262.compile_pattern(pattern).search, sub)
+        for pattern, sub in fields.get("patternProperties", {}).items()
+    ]
+    additional: Schema | None = fields.get("additionalProperties")
+    property_names: Schema | None = fields.get("propertyNames")
+    prefix_items: list[Schema] = fields.get("prefixItems", [])
+    items: Schema | None = fields.get("items")
+    contains: Schema | None = fields.get("contains")
+
+    key = ""
+    child = None
+    child_contains = False
+    shared_results = None
+
+    while True:
+        event, data = yield
+
+        if shared is not None:
+            stop = _send(shared, (event, data))
+            if stop is not None:
+                shared_results = stop.value
+
+        if child is not None:
+            stop = _send(child, (event, data))
+            if stop is not None:
+                child = None
+                results = stop.value
+                if child_contains and results.pop():
+                    contained += 1
+                if not all(results):
+                    yield from _skip(1)
+                    return False
+            continue
+
+        if event == END_OBJECT or event == END_ARRAY:
+            break
+
+        if event == KEY:
+            key = data
+            count += 1
+            if keys is not None:
+                keys.add(key)
+            if property_names is not None and not property_names.validate(
+                key,
+                prev_scope=scope
+            ):
+                yield from _skip(1)
+                return False
+            continue
+
+        subs = list[Schema]()
+        child_contains = False
+        if is_object:
+            if key in properties:
+                subs.append(properties[key])
+            for search, sub in pattern_properties:
+                if search(key) is not None:
+                    subs.append(sub)
+            if len(subs) == 0 and additional is not None:
+                subs.append(additional)
+        else:
+            if count < len(prefix_items):
+                subs.append(prefix_items[count])
+            elif items is not None:
+                subs.append(items)
+            if contains is not None:
+                subs.append(contains)
+                child_contains = True
+            count += 1
+
+        child = _all([_value(sub, scope) for sub in subs] or [_skip()])
+        next(child)
+        stop = _send(child, (event, data))
+        if stop is not None:
+            child = None
+            results = stop.value
+            if child_contains and results.pop():
+                contained += 1
+            if not all(results):
+                yield from _skip(1)
+                return False
+
+    if is_object:
+        if count < fields.get("minProperties", 0):
+            return False
+        if count > fields.get("maxProperties", sys.maxsize):
+            return False
+        if keys is not None:
+            for req in fields.get("required", []):
+                if req not in keys:
+                    return False
+            for name, required in fields.get("dependentRequired", {}).items():
+                if name in keys:
+                    for req in required:
+                        if req not in keys:
+                            return False
+    else:
+        if count < fields.get("minItems", 0):
+            return False
+        if count > fields.get("maxItems", sys.maxsize):
+            return False
+        if contains is not None and (
+            contained < fields.get("minContains", 1)
+            or contained > fields.get("maxContains", sys.maxsize)
+        ):
+            return False
+
+    if shared_results is None:
+        return True
+
+    for kind, start, end, extra in checks:
+        results = shared_results[start:end]
+        match kind:
+            case "allOf":
+                valid = all(results)
+            case "anyOf":
+                valid = any(results)
+            case "oneOf":
+                valid = results.count(True) == 1
+            case "not":
+                valid = not results[0]
+            case "if":
+                has_then, has_else = extra
+                if results[0]:
+                    valid = not has_then or results[1]
+                else:
+                    valid = not has_else or results[-1]
+            case "dependentSchemas":
+                valid = keys is None or extra not in keys or results[0]
+            case _:
+                valid = True
+        if not valid:
+            return False
+
+    return True
@@ -1,26 +1,189 @@
+from typing import Any, Callable, MutableMapping
+from .output import Location, Output
+from .budget import Budget
+from .profile import Profiler
 from .schema import Schema, LexicalScope
 
 
 class DynamicScope:
+    __slots__ = (
+        "lexical_scope", "prev_dynamic_scope", "instance", "evaluated_props",
+        "evaluated_items", "monitor", "memo",
+        "_anchor_chain"
+    )
 
     def __init__(
         self,
         current_lexical_scope: LexicalScope,
-        prev_dynamic_scope: "DynamicScope | None"
+        prev_dynamic_scope: "DynamicScope | None",
+        instance=None,
+        annotate: bool = False
     ):
         self.lexical_scope = current_lexical_scope
         self.prev_dynamic_scope = prev_dynamic_scope
-        self.evaluated_props = set[str]()
-        self.evaluated_items = set[int]()
+        self.instance = instance
+        # the profiler or budget of the validation, see Schema.validate
+        self.monitor: "Profiler | Budget | None" = (
+            None if prev_dynamic_scope is None
+            else prev_dynamic_scope.monitor
+        )
+        # results of referenced schemas by instance node, for the validation
+        # as a whole if it memoizes them, see Core._memoized
+        self.memo: "dict[tuple[Schema, int], tuple[Any, bool]] | None" = (
+            None if prev_dynamic_scope is None
+            else prev_dynamic_scope.memo
+        )
+        # resolved on demand, False until then
+        self._anchor_chain: "AnchorChain | bool | None" = False
+        # only allocated when some "unevaluated*" keyword can observe them,
+        # and only the one the type of the instance has
+        self.evaluated_props: set[str] | None = None
+        self.evaluated_items: set[int] | None = None
+        if annotate:
+            if isinstance(instance, dict):
+                self.evaluated_props = set[str]()
+            elif isinstance(instance, list):
+                self.evaluated_items = set[int]()
+
+    def anchor_chain(self) -> "AnchorChain | None":
+        pending = list[DynamicScope]()
+        scope: DynamicScope | None = self
+        while scope is not None and scope._anchor_chain is False:
+            pending.append(scope)
+            scope = scope.prev_dynamic_scope
+
+        chain = None
+        if scope is not None:
+            assert not isinstance(scope._anchor_chain, bool)
+            chain = scope._anchor_chain
+
+        for scope in reversed(pending):
+            chain = AnchorChain.extend(chain, scope.lexical_scope)
+            scope._anchor_chain = chain
+
+        return chain
+
+
+class AnchorChain:
+    # the lexical scopes declaring anchors a dynamic scope is nested in, the
+    # outermost first; chains are shared by every dynamic scope with the
+    # same ones, so that they cache the resolution of dynamic references
+    __slots__ = (
+        "lexical_scope", "prev", "extensions", "targets", "outer", "inner",
+        "root", "equivalents"
+    )
+
+    def __init__(
+        self,
+        lexical_scope: LexicalScope,
+        prev: "AnchorChain | None"
+    ):
+        self.lexical_scope = lexical_scope
+        self.prev = prev
+        self.extensions = dict[LexicalScope, AnchorChain]()
+        self.targets = dict[str, "Schema | None"]()
+        # a resolution only depends on the order in which scopes first
+        # appear from the outermost one, and last appear from the innermost
+        # one, so a recursion repeating scopes already in the chain ends up
+        # at a chain it already made
+        self.outer, self.inner = AnchorChain._orders(lexical_scope, prev)
+        self.root: AnchorChain = self if prev is None else prev.root
+        # the chains made from this one by their orders, kept by the root
+        self.equivalents: (
+            "dict[tuple[tuple, tuple], AnchorChain] | None"
+        ) = None
+        if prev is None:
+            self.equivalents = {(self.outer, self.inner): self}
+
+    @staticmethod
+    def _orders(
+        lexical_scope: LexicalScope,
+        prev: "AnchorChain | None"
+    ) -> tuple[tuple[LexicalScope, ...], tuple[LexicalScope, ...]]:
+        if prev is None:
+            return (lexical_scope,), (lexical_scope,)
+        outer = prev.outer
+        if lexical_scope not in outer:
+            outer = (*outer, lexical_scope)
+        inner = (
+            lexical_scope,
+            *(s for s in prev.inner if s is not lexical_scope)
+        )
+        return outer, inner
+
+    @staticmethod
+    def extend(
+        chain: "AnchorChain | None",
+        lexical_scope: LexicalScope
+    ) -> "AnchorChain | None":
+        # scopes without anchors don't take part in the resolution, and
+        # neither does a scope repeating the innermost one
+        if (
+            len(lexical_scope.anchors) == 0
+            and len(lexical_scope.dynamic_anchors) == 0
+            or chain is not None and chain.lexical_scope is lexical_scope
+        ):
+            return chain
+
+        if chain is None:
+            if lexical_scope.anchor_chain is None:
+                lexical_scope.anchor_chain = AnchorChain(lexical_scope, None)
+            return lexical_scope.anchor_chain
+
+        extension = chain.extensions.get(lexical_scope)
+        if extension is None:
+            equivalents = chain.root.equivalents
+            assert equivalents is not None
+            key = AnchorChain._orders(lexical_scope, chain)
+            extension = equivalents.get(key)
+            if extension is None:
+                extension = AnchorChain(lexical_scope, chain)
+                equivalents[key] = extension
+            chain.extensions[lexical_scope] = extension
+        return extension
+
+    def resolve(self, anchor: str) -> "Schema | None":
+        try:
+            return self.targets[anchor]
+        except KeyError:
+            pass
+
+        # the innermost plain anchor, unless a dynamic anchor comes first,
+        # in which case the outermost dynamic anchor
+        target = None
+        found = None
+        chain: AnchorChain | None = self
+        while chain is not None:
+            lexical_scope = chain.lexical_scope
+            if found is None and anchor in lexical_scope.anchors:
+                target = lexical_scope.anchors[anchor]
+                break
+            if anchor in lexical_scope.dynamic_anchors:
+                found = lexical_scope.dynamic_anchors[anchor]
+            chain = chain.prev
+        else:
+            target = found
+
+        self.targets[anchor] = target
+        return target
+
+
+Validator = Callable[[Any, DynamicScope], bool]
 
 
 class Vocabulary:
     by_uri = dict[str, type["Vocabulary"]]()
+    # keyword handlers of higher-order vocabularies run after lower ones,
+    # so that e.g. "unevaluated*" sees the annotations of every applicator
+    order = 0
+    # the keywords each compiled handler evaluates, by handler name, so that
+    # a profile can tell them apart
+    keywords = dict[str, tuple[str, ...]]()
 
     @staticmethod
     def on_schema_init(
         schema: Schema,
-        schema_by_uri: dict[str, "Schema | dict | bool"],
+        schema_by_uri: MutableMapping[str, "Schema | dict | bool"],
         refs: list
     ):
         pass
@@ -28,14 +191,30 @@ class Vocabulary:
     # @staticmethod
     # def on_schema_post_init(
     #     schema: Schema,
-    #     schema_by_uri: dict[str, "Schema | dict | bool"]
+    #     schema_by_uri: MutableMapping[str, "Schema | dict | bool"]
     # ):
     #     pass
 
     @staticmethod
-    def validate(
+    def in_place_subschemas(
+        schema: Schema
+    ) -> list[Schema]:
+        return []
+
+    @staticmethod
+    def compile(
+        schema: Schema
+    ) -> list[Validator]:
+        return []
+
+    # the output units of the keywords the instance fails, only called for
+    # failing schemas, see Schema.explain
+    @staticmethod
+    def explain(
         schema: Schema,
         instance,
-        dynamic_scope: DynamicScope
-    ):
-        pass
+        scope: DynamicScope,
+        location: Location,
+        output: Output
+    ) -> list[dict]:
+        return []
@@ -0,0 +1,102 @@
+import pytest
+
+from jsonschema import ecma262
+from jsonschema.budget import (
+    DEADLINE, DEPTH, EVALUATIONS, Budget, BudgetExceeded
+)
+from jsonschema.profile import Profiler
+from jsonschema.schema import Schema
+
+TREE = Schema({
+    "$defs": {
+        "node": {
+            "type": "object",
+            "properties": {"child": {"$ref": "#/$defs/node"}}
+        }
+    },
+    "$ref": "#/$defs/node"
+})
+
+
+def tree(depth: int) -> dict:
+    node = dict()
+    for _ in range(depth):
+        node = {"child": node}
+    return node
+
+
+def test_within_budget():
+    budget = Budget(max_evaluations=1000, max_depth=100, timeout=60)
+    assert TREE.validate(tree(5), budget=budget) is True
+    assert TREE.validate(tree(5) | {"child": 1}, budget=budget) is False
+
+
+def test_depth():
+    budget = Budget(max_depth=10)
+    with pytest.raises(BudgetExceeded) as info:
+        TREE.validate(tree(20), budget=budget)
+    assert info.value.budget == DEPTH
+    assert info.value.limit == 10
+    assert info.value.depth == 11
+    assert info.value.location.startswith("#/")
+    # a budget starts over for every validation
+    assert TREE.validate(tree(2), budget=budget) is True
+
+
+def test_evaluations():
+    budget = Budget(max_evaluations=20)
+    with pytest.raises(BudgetExceeded) as info:
+        TREE.validate(tree(20), budget=budget)
+    assert info.value.budget == EVALUATIONS
+    assert info.value.evaluations > 20
+    assert TREE.validate(tree(1), budget=budget) is True
+
+
+def test_deadline():
+    ticks = iter(range(1000))
+    budget = Budget(timeout=5, clock=lambda: float(next(ticks)))
+    with pytest.raises(BudgetExceeded) as info:
+        TREE.validate(tree(20), budget=budget)
+    assert info.value.budget == DEADLINE
+    assert str(info.value).startswith(
+        "validation exceeded its deadline budget of 5 at #"
+    )
+
+
+def test_profiled_through_the_budget():
+    profiler = Profiler()
+    budget = Budget(max_depth=100, profiler=profiler)
+    assert TREE.validate(tree(3), budget=budget) is True
+    assert profiler.report("references")[0]["calls"] == 4
+
+    with pytest.raises(ValueError):
+        TREE.validate(tree(3), budget=budget, profiler=profiler)
+
+
+def test_deadline_is_not_checked_during_a_search(monkeypatch):
+    now = [0.0]
+
+    class SlowPattern:
+        # stands for a search backtracking for a minute
+        def search(self, instance):
+            now[0] += 60
+            return None
+
+    monkeypatch.setattr(
+        ecma262, "compile_pattern", lambda pattern: SlowPattern()
+    )
+    schema = Schema({
+        "properties": {"a": {"not": {"pattern": "a"}}, "b": True}
+    })
+    budget = Budget(timeout=5, clock=lambda: now[0])
+
+    # the search runs to its end, the next schema entered notices
+    with pytest.raises(BudgetExceeded) as info:
+        schema.validate({"a": "a", "b": 1}, budget=budget)
+    assert info.value.budget == DEADLINE
+    assert info.value.location == "#/properties/b"
+    assert now[0] == 60
+
+    # without one, the validation completes late
+    assert schema.validate({"a": "a"}, budget=budget) is True
+    assert now[0] == 120
@@ -0,0 +1,64 @@
+import pytest
+
+from jsonschema import cache
+from jsonschema.cache import ResultCache, instance_equal, instance_hash
+from jsonschema.schema import Schema
+
+SCHEMA = Schema({"type": "object", "properties": {"a": {"const": 1}}})
+
+
+def test_hits_and_misses():
+    results = ResultCache()
+    assert results.validate(SCHEMA, {"a": 1, "b": [1.5]}) is True
+    assert results.validate(SCHEMA, {"b": [1.5], "a": 1}) is True
+    assert results.validate(SCHEMA, {"a": 2}) is False
+    assert results.validate(SCHEMA, {"a": 2}) is False
+    assert results.stats() == {
+        "size": 2, "hits": 2, "misses": 2, "evictions": 0, "expirations": 0
+    }
+
+
+@pytest.mark.parametrize("a, b", [
+    (1, True), (1, 1.0), (True, 1.0), (0, False), ([1], [True]),
+    ({"a": 1}, {"a": 1.0}), ([1, 2], [2, 1]), ({"a": None}, {"b": None})
+])
+def test_equal_in_python_but_not_as_instances(a, b):
+    assert not instance_equal(a, b)
+    results = ResultCache()
+    assert results.validate(SCHEMA, {"a": a}) is (a == 1 and a is not True)
+    assert results.validate(SCHEMA, {"a": b}) is (b == 1 and b is not True)
+    assert results.hits == 0
+
+
+def test_same_hash_different_instances(monkeypatch):
+    monkeypatch.setattr(cache, "instance_hash", lambda value: 0)
+    results = ResultCache()
+    assert results.validate(SCHEMA, {"a": 1}) is True
+    assert results.validate(SCHEMA, {"a": True}) is False
+    assert results.validate(SCHEMA, {"a": True}) is False
+    assert results.hits == 1 and results.misses == 2
+
+
+def test_hash_ignores_key_order():
+    assert instance_hash({"a": 1, "b": [1, {"c": 2}]}) == \
+        instance_hash({"b": [1, {"c": 2}], "a": 1})
+
+
+def test_evicts_least_recently_used():
+    results = ResultCache(max_size=2)
+    for a in (1, 2, 1, 3):
+        results.validate(SCHEMA, {"a": a})
+    assert results.evictions == 1
+    assert results.lookup(SCHEMA, {"a": 1}) is True
+    assert results.lookup(SCHEMA, {"a": 2}) is None
+
+
+def test_raw_documents_and_expiry():
+    now = [0.0]
+    results = ResultCache(ttl=10, clock=lambda: now[0])
+    results.store(SCHEMA, False, raw=b'{"a": 2}')
+    assert results.lookup(SCHEMA, raw=b'{"a": 2}') is False
+    assert results.lookup(SCHEMA, raw=b'{"a":2}') is None
+    now[0] = 10.0
+    assert results.lookup(SCHEMA, raw=b'{"a": 2}') is None
+    assert results.expirations == 1 and len(results) == 0
@@ -0,0 +1,38 @@
+import re
+
+import pytest
+
+from jsonschema.ecma262 import compile_pattern
+from jsonschema.schema import Schema
+
+
+@pytest.mark.parametrize("char", ["\t", " ", "\xa0", "\u2028", "\ufeff"])
+def test_negated_escapes_in_classes_use_ecma_whitespace(char):
+    assert not compile_pattern(r"^[\S]$").search(char)
+    assert compile_pattern(r"^[^\S]$").search(char)
+
+
+@pytest.mark.parametrize("pattern, matches, fails", [
+    (r"^[\S]$", ["a", "\U0001f600"], []),
+    (r"^[\D]$", ["a", "\u0663"], ["5"]),
+    (r"^[\W]$", ["\xe9", "-"], ["_", "z"]),
+    (r"^[\dA]+$", ["1A2"], ["a"]),
+])
+def test_class_escapes(pattern, matches, fails):
+    for instance in matches:
+        assert compile_pattern(pattern).search(instance)
+    for instance in fails:
+        assert not compile_pattern(pattern).search(instance)
+
+
+def test_braces_not_quantifying_are_literals():
+    assert compile_pattern(r"^a{,3}$").search("a{,3}")
+    assert not compile_pattern(r"^a{,3}$").search("aa")
+    assert compile_pattern(r"^a{2,3}$").search("aaa")
+    assert compile_pattern(r"^{x}$").search("{x}")
+
+
+@pytest.mark.parametrize("pattern", [r"\p{L}", r"\P{Lu}", r"\Aa", r"a\Z"])
+def test_untranslatable_escapes_fail_at_build_time(pattern):
+    with pytest.raises(re.error):
+        Schema({"pattern": pattern})
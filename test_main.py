@@ -0,0 +1,73 @@
+import json
+
+from jsonschema.__main__ import main
+
+
+def write(directory, name: str, text: str | bytes) -> str:
+    path = directory / name
+    if isinstance(text, str):
+        text = text.encode()
+    path.write_bytes(text)
+    return str(path)
+
+
+def results(capsys) -> list[tuple[int, bool]]:
+    lines = capsys.readouterr().out.splitlines()
+    return [
+        (result["record"], result["valid"])
+        for result in map(json.loads, lines)
+    ]
+
+
+def test_reports_records_in_order(tmp_path, capsys):
+    schema = write(tmp_path, "schema.json", '{"type": "integer"}')
+    records = write(tmp_path, "records.ndjson", '1\n"a"\n\n{bad\n2\n')
+
+    assert main([schema, records]) == 1
+    # blank lines are counted, but not reported
+    assert results(capsys) == [(1, True), (2, False), (4, False), (5, True)]
+
+
+def test_failures_only_and_summary(tmp_path, capsys):
+    schema = write(tmp_path, "schema.json", '{"type": "integer"}')
+    records = write(tmp_path, "records.ndjson", '1\n"a"\n2\n')
+
+    assert main([schema, records, "--failures-only"]) == 1
+    captured = capsys.readouterr()
+    lines = captured.out.splitlines()
+    assert [json.loads(line)["record"] for line in lines] == [2]
+    assert captured.err.startswith("records: 3, failures: 1 (malformed: 0)")
+
+
+def test_json_text_sequences(tmp_path, capsys):
+    schema = write(tmp_path, "schema.json", '{"type": "array"}')
+    records = write(tmp_path, "records.seq", b'\x1e[1,\n2]\n\x1e{}\n\x1e[]')
+
+    assert main([schema, records, "--seq", "--buffer-size", "4"]) == 1
+    assert results(capsys) == [(1, True), (2, False), (3, True)]
+
+
+def test_cached_records(tmp_path, capsys):
+    schema = write(tmp_path, "schema.json", '{"type": "integer"}')
+    records = write(tmp_path, "records.ndjson", '1\n"a"\n1\n"a"\n')
+
+    assert main([schema, records, "--cache", "8", "--chunk-size", "1"]) == 1
+    captured = capsys.readouterr()
+    lines = captured.out.splitlines()
+    assert [json.loads(line)["valid"] for line in lines] \
+        == [True, False, True, False]
+    assert "failures: 2 (malformed: 0), cached: 2," in captured.err
+
+
+def test_references_into_the_schema_directory(tmp_path, capsys):
+    (tmp_path / "remotes").mkdir()
+    write(tmp_path / "remotes", "name.json", '{"type": "string"}')
+    schema = write(
+        tmp_path, "schema.json",
+        '{"items": {"$ref": "http://localhost:1234/name.json"}}'
+    )
+    records = write(tmp_path, "records.ndjson", '["a"]\n[1]\n')
+
+    directory = str(tmp_path / "remotes")
+    assert main([schema, records, "--schema-dir", directory]) == 1
+    assert results(capsys) == [(1, True), (2, False)]
@@ -0,0 +1,77 @@
+import pytest
+
+from jsonschema.schema import Schema
+
+SCHEMA = Schema({
+    "$id": "https://example.com/s",
+    "properties": {
+        "a": {"type": "integer"},
+        "b": {"$ref": "#/$defs/short"},
+        "c~/d": {"const": 1}
+    },
+    "required": ["id"],
+    "$defs": {"short": {"maxLength": 2}}
+})
+
+INSTANCE = {"id": 1, "a": "x", "b": "long", "c~/d": 2}
+
+
+def locations(units: list[dict]) -> list[tuple]:
+    return [
+        (u["keywordLocation"], u["absoluteKeywordLocation"],
+         u["instanceLocation"])
+        for u in units
+    ]
+
+
+def test_valid_instances_only_have_a_flag():
+    for format in ("flag", "basic", "detailed"):
+        assert SCHEMA.evaluate({"id": 1}, format) == {"valid": True}
+    assert SCHEMA.evaluate(INSTANCE) == {"valid": False}
+
+
+def test_basic():
+    output = SCHEMA.evaluate(INSTANCE, "basic")
+    assert output["valid"] is False
+    assert locations(output["errors"]) == [
+        ("/properties/a/type",
+         "https://example.com/s#/properties/a/type", "/a"),
+        ("/properties/b/$ref/maxLength",
+         "https://example.com/s#/$defs/short/maxLength", "/b"),
+        ("/properties/c~0~1d/const",
+         "https://example.com/s#/properties/c~0~1d/const", "/c~0~1d"),
+    ]
+    assert output["errors"][0]["error"] == '"x" is not of type "integer"'
+
+
+def test_detailed_nests_errors_by_schema():
+    output = SCHEMA.evaluate(INSTANCE, "detailed")
+    assert output["keywordLocation"] == ""
+    assert output["absoluteKeywordLocation"] == "https://example.com/s#"
+    b = output["errors"][1]
+    assert locations([b, b["errors"][0], b["errors"][0]["errors"][0]]) == [
+        ("/properties/b", "https://example.com/s#/properties/b", "/b"),
+        ("/properties/b/$ref", "https://example.com/s#/$defs/short", "/b"),
+        ("/properties/b/$ref/maxLength",
+         "https://example.com/s#/$defs/short/maxLength", "/b"),
+    ]
+
+
+def test_max_errors():
+    output = SCHEMA.evaluate(INSTANCE, "basic", max_errors=1)
+    assert len(output["errors"]) == 1
+
+
+def test_schemas_without_uri_and_false_schemas():
+    output = Schema({"items": False}).evaluate([1], "basic")
+    assert output["errors"] == [{
+        "valid": False,
+        "keywordLocation": "/items",
+        "instanceLocation": "/0",
+        "error": "1 is not allowed"
+    }]
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        SCHEMA.evaluate(INSTANCE, "verbose")
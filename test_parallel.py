@@ -0,0 +1,101 @@
+import multiprocessing
+import pickle
+
+import pytest
+
+from jsonschema import parallel
+from jsonschema.parallel import ParallelValidator
+from jsonschema.schema import Schema
+
+NAME = {
+    "$id": "https://example.com/name",
+    "type": "string",
+    "$defs": {"short": {"maxLength": 3}}
+}
+
+SCHEMA = {
+    "type": "array",
+    "items": {"$ref": "https://example.com/name#/$defs/short"}
+}
+
+
+def test_workers_rebuild_compiled_schemas(monkeypatch):
+    schema_by_uri = dict[str, Schema | dict | bool]()
+    Schema(NAME, schema_by_uri=schema_by_uri)
+    assert isinstance(schema_by_uri["https://example.com/name"], Schema)
+
+    validator = ParallelValidator(SCHEMA, schema_by_uri, processes=1)
+    # as a worker started with "spawn" would get them
+    raw_schema_by_uri = pickle.loads(pickle.dumps(validator.raw_schema_by_uri))
+    assert raw_schema_by_uri == {"https://example.com/name": NAME}
+
+    monkeypatch.setattr(parallel, "_data", None)
+    monkeypatch.setattr(parallel, "_schema", None)
+    parallel._init_worker(
+        SCHEMA, raw_schema_by_uri, validator.compiled_uris
+    )
+    assert parallel._validate_chunk([["abc"], ["abcd"]]) == [True, False]
+
+
+def test_validate_in_workers():
+    instances = [["a", "b"], ["toolong"], [], ["abcd"]] * 50
+    schema_by_uri: dict[str, Schema | dict | bool] = {
+        "https://example.com/name": NAME
+    }
+    with ParallelValidator(SCHEMA, schema_by_uri, processes=2) as validator:
+        results = list(validator.validate(instances))
+    assert results == [True, False, True, False] * 50
+    assert validator.documents == 200
+    assert validator.failures == 100
+
+
+def test_validate_timed():
+    schema_by_uri: dict[str, Schema | dict | bool] = {
+        "https://example.com/name": NAME
+    }
+    validator = ParallelValidator(SCHEMA, schema_by_uri, processes=1)
+    results = list(validator.validate_timed([["a"], ["abcd"]]))
+    assert [valid for valid, _ in results] == [True, False]
+    assert all(seconds >= 0.0 for _, seconds in results)
+    assert validator.failures == 1
+
+
+EMBEDDING = {
+    "$id": "https://example.com/root.json",
+    "$defs": {"short": {"$id": "short.json", "maxLength": 3}}
+}
+
+
+def test_spawned_workers_rebuild_embedded_resources():
+    schema_by_uri = dict[str, Schema | dict | bool]()
+    Schema(EMBEDDING, schema_by_uri=schema_by_uri)
+    assert "https://example.com/short.json" in schema_by_uri
+
+    validator = ParallelValidator(
+        {"items": {"$ref": "https://example.com/short.json"}},
+        schema_by_uri,
+        processes=2,
+        chunk_size=1,
+        context=multiprocessing.get_context("spawn")
+    )
+    # embedded resources come with the document embedding them
+    assert list(validator.raw_schema_by_uri) == [
+        "https://example.com/root.json"
+    ]
+    with validator:
+        results = list(validator.validate([["abc"], ["abcd"]] * 4))
+    assert results == [True, False] * 4
+
+
+def test_worker_initialization_errors_reach_the_parent():
+    validator = ParallelValidator(
+        SCHEMA,
+        {"https://example.com/name": NAME},
+        processes=1,
+        context=multiprocessing.get_context("spawn")
+    )
+    validator.processes = 2
+    validator.compiled_uris.append("https://example.com/missing")
+    with validator:
+        with pytest.raises(KeyError):
+            list(validator.validate([["a"]]))
@@ -0,0 +1,70 @@
+import pytest
+
+from jsonschema.profile import Profiler
+from jsonschema.schema import Schema
+
+SCHEMA = Schema({
+    "type": "array",
+    "items": {"$ref": "#/$defs/natural"},
+    "$defs": {"natural": {"type": "integer", "minimum": 0}}
+})
+
+
+def counts(rows: list[dict]) -> dict[str, tuple[int, int]]:
+    return {row["name"]: (row["calls"], row["failures"]) for row in rows}
+
+
+def test_counts_calls_and_failures():
+    profiler = Profiler()
+    assert SCHEMA.validate([1, 2, -1], profiler=profiler) is False
+
+    keywords = counts(profiler.report())
+    assert keywords["#/items"] == (1, 1)
+    assert keywords["#/items/$ref"] == (3, 1)
+    assert keywords["#/$defs/natural/type"] == (3, 0)
+    assert keywords["#/$defs/natural/minimum"] == (3, 1)
+    assert counts(profiler.report("vocabularies")) == {
+        "Applicator": (1, 1), "Core": (3, 1), "Validation": (6, 1)
+    }
+    assert counts(profiler.report("references")) == {
+        "#/$defs/natural": (3, 1)
+    }
+
+
+def test_nested_time_is_not_own_time():
+    ticks = iter(range(1000))
+    profiler = Profiler(clock=lambda: float(next(ticks)))
+    SCHEMA.validate([1], profiler=profiler)
+
+    rows = {row["name"]: row for row in profiler.report()}
+    items, ref = rows["#/items"], rows["#/items/$ref"]
+    # the keywords of the schema referred to run within "$ref"
+    assert items["own"] == items["cumulative"] - ref["cumulative"]
+    assert ref["own"] == ref["cumulative"] - sum(
+        rows[f"#/$defs/natural/{k}"]["cumulative"]
+        for k in ("type", "minimum")
+    )
+
+
+def test_results_add_up_across_validations():
+    profiler = Profiler()
+    for _ in range(3):
+        SCHEMA.validate([1], profiler=profiler)
+    assert counts(profiler.report())["#/$defs/natural/minimum"] == (3, 0)
+
+
+def test_report_sorting_and_format():
+    profiler = Profiler()
+    SCHEMA.validate([1, 2], profiler=profiler)
+
+    rows = profiler.report(sort="calls", limit=2)
+    assert [row["calls"] for row in rows] == [2, 2]
+    lines = profiler.format(sort="calls", limit=2).splitlines()
+    assert lines[0].split() == ["calls", "failures", "cumulative", "own",
+                                "name"]
+    assert len(lines) == 3
+
+    with pytest.raises(ValueError):
+        profiler.report(by="schemas")
+    with pytest.raises(ValueError):
+        profiler.report(sort="name")
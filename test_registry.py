@@ -0,0 +1,103 @@
+import json
+
+from jsonschema.draft_2020_12 import raw
+from jsonschema.registry import SchemaRegistry
+from jsonschema.schema import Schema
+
+
+def write(directory, name: str, data: dict):
+    with open(directory / name, "w") as f:
+        json.dump(data, f)
+
+
+def tenants(directory, count: int):
+    for i in range(count):
+        write(directory, f"t{i}.json", {
+            # differs from the uri of the file
+            "$id": f"https://example.com/tenants/{i}",
+            "type": "object",
+            "properties": {"id": {"$ref": "#/$defs/id"}},
+            "$defs": {
+                "id": {"type": "integer"},
+                "embedded": {
+                    "$id": f"https://example.com/embedded/{i}",
+                    "type": "string"
+                }
+            }
+        })
+
+
+def test_evicts_least_recently_used(tmp_path):
+    tenants(tmp_path, 3)
+    registry = SchemaRegistry(str(tmp_path), max_schemas=3)
+
+    for i in range(3):
+        schema = registry[f"http://localhost:1234/t{i}.json"]
+        assert isinstance(schema, Schema)
+
+    # each file is registered under its path, its "$id" and the embedded one
+    assert registry.evictions == 6
+    assert "http://localhost:1234/t2.json" in registry._compiled
+    assert "http://localhost:1234/t0.json" not in registry._compiled
+
+
+def test_reloads_evicted_schema_whose_id_differs_from_its_path(tmp_path):
+    tenants(tmp_path, 3)
+    registry = SchemaRegistry(str(tmp_path), max_schemas=11)
+    registry.update(raw.schema_by_uri)
+
+    for i in (0, 1, 2, 0):
+        schema = registry[f"http://localhost:1234/t{i}.json"]
+        assert isinstance(schema, Schema)
+        assert schema.validate({"id": 1})
+        assert not schema.validate({"id": "x"})
+
+    for uri in (
+        "https://example.com/tenants/1",
+        "https://example.com/embedded/1",
+    ):
+        schema = registry[uri]
+        assert isinstance(schema, Schema)
+
+
+def test_restores_embedded_resource_through_its_root(tmp_path):
+    tenants(tmp_path, 2)
+    registry = SchemaRegistry(str(tmp_path), max_schemas=3)
+
+    registry["http://localhost:1234/t0.json"]
+    registry["http://localhost:1234/t1.json"]
+    assert "https://example.com/embedded/0" not in registry._compiled
+
+    loads = registry.loads
+    embedded = registry["https://example.com/embedded/0"]
+    assert isinstance(embedded, Schema)
+    assert embedded.validate("x") and not embedded.validate(1)
+    assert registry.loads == loads + 1
+
+
+def test_given_schemas_neither_count_nor_get_evicted(tmp_path):
+    tenants(tmp_path, 3)
+    registry = SchemaRegistry(str(tmp_path), max_schemas=6)
+    registry.update(raw.schema_by_uri)
+
+    registry["http://localhost:1234/t0.json"]
+    registry["http://localhost:1234/t1.json"]
+    registry["http://localhost:1234/t0.json"]
+    assert registry.hits == 1
+    assert registry.evictions == 0
+
+    registry["http://localhost:1234/t2.json"]
+    assert registry.evictions == 3
+    assert "http://localhost:1234/t2.json" in registry._compiled
+    for uri in raw.schema_by_uri:
+        assert uri in registry._compiled
+
+
+def test_references_between_files(tmp_path):
+    write(tmp_path, "a.json", {"$ref": "b.json"})
+    write(tmp_path, "b.json", {"type": "integer"})
+    registry = SchemaRegistry(str(tmp_path), max_schemas=1)
+
+    schema = registry["http://localhost:1234/a.json"]
+    assert isinstance(schema, Schema)
+    assert schema.validate(1) and not schema.validate("x")
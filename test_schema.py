@@ -0,0 +1,138 @@
+import threading
+
+from jsonschema.schema import Schema
+
+DEFS = {
+    "$defs": {
+        "positive": {"type": "integer", "minimum": 1},
+        "named": {"properties": {"id": {"$ref": "#/$defs/positive"}}}
+    },
+    "properties": {
+        "named": {"$ref": "#/$defs/named"},
+        "other": {"type": "string"}
+    }
+}
+
+RESOURCES = {
+    "$id": "https://example.com/root.json",
+    "$defs": {
+        "nested": {
+            "properties": {
+                "item": {
+                    "$id": "item.json",
+                    "$defs": {"short": {"$anchor": "short", "maxLength": 3}},
+                    "type": "integer"
+                }
+            }
+        },
+        "anchored": {"$anchor": "text", "type": "string"},
+        "plain": {"type": "boolean"}
+    },
+    "properties": {
+        "item": {"$ref": "item.json"},
+        "short": {"$ref": "item.json#short"},
+        "text": {"$ref": "#text"}
+    }
+}
+
+
+def test_subschemas_are_built_on_first_use():
+    schema = Schema(DEFS, lazy=True)
+    defs = schema.fields["$defs"]
+    properties = schema.fields["properties"]
+    assert defs["positive"].deferred and defs["named"].deferred
+    assert properties["other"].deferred
+
+    assert schema.validate({"other": "a"})
+    assert not properties["other"].deferred
+    assert defs["positive"].deferred and defs["named"].deferred
+
+    assert not schema.validate({"named": {"id": 0}})
+    assert not defs["positive"].deferred and not defs["named"].deferred
+
+
+def test_concurrent_first_use_builds_once(monkeypatch):
+    built = list[int]()
+    init = Schema._init
+
+    def counted(self, *args, **kwargs):
+        built.append(id(self))
+        init(self, *args, **kwargs)
+
+    monkeypatch.setattr(Schema, "_init", counted)
+    schema = Schema(DEFS, lazy=True)
+    built.clear()
+
+    barrier = threading.Barrier(8)
+    results = list[bool]()
+
+    def validate():
+        barrier.wait()
+        results.append(
+            schema.validate({"named": {"id": 1}})
+            and not schema.validate({"named": {"id": 0}})
+        )
+
+    threads = [threading.Thread(target=validate) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [True] * 8
+    assert len(built) == len(set(built))
+    assert id(schema.fields["$defs"]["named"]) in built
+
+
+def test_resources_in_deferred_subtrees_resolve():
+    schema = Schema(RESOURCES, lazy=True)
+    defs = schema.fields["$defs"]
+    assert defs["plain"].deferred
+    assert not defs["nested"].deferred and not defs["anchored"].deferred
+
+    assert schema.validate({"item": 1, "short": "abc", "text": "a"})
+    assert not schema.validate({"item": "1"})
+    assert not schema.validate({"short": "abcd"})
+    assert not schema.validate({"text": 1})
+
+
+def test_validate_many():
+    schema = Schema({"type": "integer"})
+    assert list(schema.validate_many([1, "a", 2])) == [True, False, True]
+    assert list(schema.validate_many([1, "a", 2], with_index=True)) == [
+        (0, True), (1, False), (2, True)
+    ]
+
+
+def test_validate_many_stops_on_failure():
+    schema = Schema({"type": "integer"})
+    consumed = list()
+
+    def instances():
+        for instance in [1, "a", 2]:
+            consumed.append(instance)
+            yield instance
+
+    assert list(schema.validate_many(
+        instances(), with_index=True, stop_on_failure=True
+    )) == [(0, True), (1, False)]
+    assert consumed == [1, "a"]
+
+
+def test_validate_many_clears_the_memo_between_documents():
+    schema = Schema({
+        "allOf": [{"$ref": "#/$defs/base"}, {"$ref": "#/$defs/base"}],
+        "$defs": {"base": {"properties": {"id": {"type": "integer"}}}}
+    })
+
+    # one object changed in place between documents, so a memo kept from
+    # the first document would answer for the second
+    def instances():
+        document: dict = {"id": 1}
+        yield document
+        document["id"] = "x"
+        yield document
+
+    assert list(schema.validate_many(instances(), memoize=True)) == [
+        True, False
+    ]
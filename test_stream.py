@@ -0,0 +1,66 @@
+import json
+from typing import Sequence
+
+import pytest
+
+from jsonschema.draft_2020_12 import raw
+from jsonschema.schema import Schema
+from jsonschema.stream import events, validate_stream
+from test_vocabulary import METASCHEMA_NO_VALIDATION
+
+
+def split(text: Sequence, size: int) -> list:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+def test_events_across_chunks(size):
+    document = {
+        "a": "caf\u00e9 \U0001f600 \" \\",
+        "b": [1, -2.5e3, True, None, {}],
+        "c\u00e9": []
+    }
+    text = json.dumps(document)
+    assert list(events(split(text, size))) == list(events([text]))
+    chunks = split(json.dumps(document, ensure_ascii=False).encode(), size)
+    assert list(events(chunks)) == list(events([text]))
+
+
+@pytest.mark.parametrize("text", [
+    '"a\x01"', '"\\q"', '"\\u12g4"', '{"a\x01": 1}'
+])
+def test_invalid_strings_fail_without_reading_further(text):
+    def chunks():
+        yield text
+        raise AssertionError("read past the invalid string")
+
+    with pytest.raises(ValueError):
+        list(events(chunks()))
+
+
+@pytest.mark.parametrize("text", ['"abc', '"\\u12', '{"a'])
+def test_unterminated_strings_fail_at_the_end(text):
+    with pytest.raises(ValueError):
+        list(events(split(text, 1)))
+
+
+def test_long_strings_are_not_scanned_again_for_every_chunk():
+    chunks = split(json.dumps(["x" * 1_000_000]), 10)
+    assert list(events(chunks))[1] == ("value", "x" * 1_000_000)
+
+
+def test_validation_keywords_need_their_vocabulary():
+    schema_by_uri = dict(raw.schema_by_uri)
+    schema_by_uri[METASCHEMA_NO_VALIDATION["$id"]] = METASCHEMA_NO_VALIDATION
+    schema = Schema(
+        {
+            "$schema": METASCHEMA_NO_VALIDATION["$id"],
+            "type": "string",
+            "required": ["a"],
+            "properties": {"b": False}
+        },
+        schema_by_uri=schema_by_uri
+    )
+
+    assert validate_stream(schema, ['{"c": 1}']) is True
+    assert validate_stream(schema, ['{"b": 1}']) is False
@@ -0,0 +1,57 @@
+import pytest
+
+from jsonschema.schema import Schema
+
+
+@pytest.mark.parametrize("instance, valid", [
+    ([1, 2, 3], True),
+    ([1, 1.0], False),
+    ([1, True], True),
+    ([0, False, None, ""], True),
+    ([{"a": 1, "b": 2}, {"b": 2, "a": 1}], False),
+    ([{"a": 1}, {"a": True}], True),
+    ([[1, [2]], [1.0, [2.0]]], False),
+    ([[1, 2], [2, 1]], True),
+    ([["boolean", True], [True]], True),
+    ("not an array", True),
+])
+def test_unique_items(instance, valid):
+    assert Schema({"uniqueItems": True}).validate(instance) is valid
+
+
+@pytest.mark.parametrize("const, instance, valid", [
+    (1, 1.0, True),
+    (1, True, False),
+    (False, 0, False),
+    (None, None, True),
+    ({"a": [1, {"b": None}]}, {"a": [1.0, {"b": None}]}, True),
+    ({"a": 1, "b": 2}, {"b": 2, "a": 1}, True),
+    ({"a": 1}, {"a": True}, False),
+    ([1, 2], [2, 1], False),
+    ("a", ["a"], False),
+])
+def test_const(const, instance, valid):
+    assert Schema({"const": const}).validate(instance) is valid
+
+
+@pytest.mark.parametrize("instance, valid", [
+    ("a", True),
+    ("b", False),
+    (1.0, True),
+    (True, False),
+    (False, True),
+    (0, False),
+    ({"y": [None], "x": 1}, True),
+    ({"x": 1}, False),
+    (["a"], False),
+])
+def test_enum(instance, valid):
+    schema = Schema({"enum": ["a", 1, False, {"x": 1, "y": [None]}]})
+    assert schema.validate(instance) is valid
+
+
+def test_enum_of_strings_only():
+    schema = Schema({"enum": ["a", "b"]})
+    assert schema.validate("b") is True
+    assert schema.validate(1) is False
+    assert schema.validate(None) is False
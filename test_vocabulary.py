@@ -0,0 +1,129 @@
+from jsonschema.draft_2020_12 import raw
+from jsonschema.profile import Profiler
+from jsonschema.schema import Schema
+
+# from the JSON-Schema-Test-Suite remotes, it lists applicator before core
+METASCHEMA_NO_VALIDATION = {
+    "$schema": "https://json-schema.org/draft/2020-12/schema",
+    "$id": "http://localhost:1234/draft2020-12/metaschema-no-validation.json",
+    "$vocabulary": {
+        "https://json-schema.org/draft/2020-12/vocab/applicator": True,
+        "https://json-schema.org/draft/2020-12/vocab/core": True
+    },
+    "$dynamicAnchor": "meta",
+    "allOf": [
+        {"$ref": "https://json-schema.org/draft/2020-12/meta/applicator"},
+        {"$ref": "https://json-schema.org/draft/2020-12/meta/core"}
+    ]
+}
+
+
+def test_core_runs_first_whatever_the_vocabulary_order():
+    schema_by_uri = dict(raw.schema_by_uri)
+    schema_by_uri[METASCHEMA_NO_VALIDATION["$id"]] = METASCHEMA_NO_VALIDATION
+
+    schema = Schema(
+        {
+            "$id": "https://schema/using/no/validation",
+            "$schema": METASCHEMA_NO_VALIDATION["$id"],
+            "properties": {
+                "badProperty": False,
+                "numberProperty": {"minimum": 10}
+            }
+        },
+        schema_by_uri=schema_by_uri
+    )
+
+    assert schema.validate({"badProperty": "this property should not exist"}) \
+        is False
+    # minimum belongs to the validation vocabulary, which is left out
+    assert schema.validate({"numberProperty": 1}) is True
+
+
+def test_memoized_references_validate_each_node_once():
+    schema = Schema({
+        "allOf": [{"$ref": "#/$defs/base"}, {"$ref": "#/$defs/base"}],
+        "$defs": {"base": {"properties": {"id": {"type": "integer"}}}}
+    })
+
+    def calls(**kwargs) -> int:
+        profiler = Profiler()
+        assert schema.validate({"id": 1}, profiler=profiler, **kwargs)
+        return profiler.references["#/$defs/base"].calls
+
+    assert calls() == 2
+    assert calls(memoize=True) == 1
+    assert schema.validate({"id": "x"}, memoize=True) is False
+    assert list(schema.validate_many(
+        [{"id": 1}, {"id": "x"}, {"id": 1}],
+        memoize=True
+    )) == [True, False, True]
+
+
+TREE = {
+    "$id": "https://example.com/tree",
+    "$dynamicAnchor": "node",
+    "type": "object",
+    "properties": {
+        "data": True,
+        "children": {"type": "array", "items": {"$dynamicRef": "#node"}}
+    }
+}
+
+STRICT_TREE = {
+    "$id": "https://example.com/strict-tree",
+    "$dynamicAnchor": "node",
+    "$ref": "tree",
+    "unevaluatedProperties": False
+}
+
+
+def trees() -> tuple[Schema, Schema]:
+    schema_by_uri = dict[str, Schema | dict | bool]()
+    tree = Schema(TREE, schema_by_uri=schema_by_uri)
+    return tree, Schema(STRICT_TREE, schema_by_uri=schema_by_uri)
+
+
+def nested(depth: int, leaf: dict) -> dict:
+    node = leaf
+    for _ in range(depth):
+        node = {"children": [node]}
+    return node
+
+
+def test_dynamic_anchor_of_the_referring_schema_wins():
+    tree, strict_tree = trees()
+    instance = {"children": [{"daat": 1}]}
+    assert tree.validate(instance) is True
+    assert strict_tree.validate(instance) is False
+    assert strict_tree.validate({"children": [{"data": 1}]}) is True
+
+
+def test_plain_anchor_of_the_same_resource_resolves_statically():
+    schema_by_uri = dict[str, Schema | dict | bool]()
+    Schema({
+        "$id": "https://example.com/list",
+        "$defs": {"item": {"$anchor": "item", "type": "integer"}},
+        "items": {"$dynamicRef": "#item"}
+    }, schema_by_uri=schema_by_uri)
+    schema = Schema({
+        "$id": "https://example.com/strings",
+        "$ref": "list",
+        "$defs": {"item": {"$dynamicAnchor": "item", "type": "string"}}
+    }, schema_by_uri=schema_by_uri)
+
+    assert schema.validate([1, 2]) is True
+    assert schema.validate(["a"]) is False
+
+
+def test_deep_recursion_reuses_anchor_chains():
+    _, strict_tree = trees()
+    assert strict_tree.validate(nested(5, {"data": 1})) is True
+    chain = strict_tree.scope.anchor_chain
+    assert chain is not None and chain.equivalents is not None
+    chains = len(chain.equivalents)
+
+    assert strict_tree.validate(nested(40, {"data": 1})) is True
+    assert strict_tree.validate(nested(40, {"daat": 1})) is False
+    # every level goes through the same two resources
+    assert len(chain.equivalents) == chains